@@ -0,0 +1,160 @@
+# includes/capture_backend_utils.py - 畫面捕捉後端介面與持久捕捉上下文
+
+"""
+畫面捕捉後端：
+- CaptureBackend：平台相關的抓圖介面（開啟資源、寫入 BGRA 緩衝、關閉資源）
+- CaptureContext：視窗尺寸不變時保持後端資源與緩衝區，尺寸改變才重新建立
+- ArrayCaptureBackend：以 NumPy 陣列模擬視窗的後端（非 Windows 環境檢查/離線使用）
+"""
+
+import threading
+import cv2
+import numpy as np
+from typing import Callable, Optional, Tuple, Union
+from includes.log_utils import get_logger
+
+
+class CaptureBackend:
+    """捕捉後端介面 - 子類別必須實作"""
+
+    name = "base"
+
+    def get_size(self, hwnd) -> Optional[Tuple[int, int]]:
+        """目前視窗尺寸 (width, height)，無效時回傳 None"""
+        raise NotImplementedError("子類別必須實作 get_size")
+
+    def open(self, hwnd, width: int, height: int) -> np.ndarray:
+        """建立捕捉資源，回傳後端持有的 (height, width, 4) BGRA 緩衝區"""
+        raise NotImplementedError("子類別必須實作 open")
+
+    def render(self, hwnd) -> bool:
+        """將視窗內容寫入 open() 回傳的緩衝區"""
+        raise NotImplementedError("子類別必須實作 render")
+
+    def close(self):
+        """釋放捕捉資源（重複呼叫安全）"""
+        pass
+
+
+class CaptureContext:
+    """持久捕捉上下文：尺寸不變時重用後端資源與 BGRA 緩衝區"""
+
+    def __init__(self, backend: CaptureBackend, reuse_output: bool = False):
+        """
+        Args:
+            backend: 捕捉後端
+            reuse_output: BGR 輸出也重用同一緩衝區（只適合同步使用、不保留畫面的呼叫者）
+        """
+        self.logger = get_logger("CaptureContext")
+        self.backend = backend
+        self.reuse_output = reuse_output
+        self.size = None
+        self.generation = 0  # 每次重建資源加一
+        self._hwnd = None
+        self._bgra = None
+        self._bgr = None
+        self._lock = threading.RLock()
+        self.stats = {'opens': 0, 'captures': 0}
+
+    def capture_bgra(self, hwnd) -> Optional[np.ndarray]:
+        """抓取畫面並回傳 BGRA 緩衝區的零複製視圖（下次捕捉或失效後內容即改變）"""
+        with self._lock:
+            return self._capture_bgra(hwnd)
+
+    def _capture_bgra(self, hwnd) -> Optional[np.ndarray]:
+        size = self.backend.get_size(hwnd)
+        if size is None or size[0] <= 0 or size[1] <= 0:
+            return None
+        if self._bgra is None or size != self.size or hwnd != self._hwnd:
+            self._open(hwnd, size)
+        try:
+            if not self.backend.render(hwnd):
+                return None
+        except Exception:
+            # 資源可能已失效（視窗重建等），下次重新建立
+            self.invalidate()
+            raise
+        self.stats['captures'] += 1
+        return self._bgra
+
+    def capture(self, hwnd) -> Optional[np.ndarray]:
+        """抓取畫面並做一次 BGRA → BGR 轉換"""
+        with self._lock:
+            bgra = self._capture_bgra(hwnd)
+            if bgra is None:
+                return None
+            if not self.reuse_output:
+                return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+            if self._bgr is None or self._bgr.shape[:2] != bgra.shape[:2]:
+                self._bgr = np.empty(bgra.shape[:2] + (3,), np.uint8)
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._bgr)
+            return self._bgr
+
+    def invalidate(self):
+        """釋放後端資源，下次捕捉時重新建立"""
+        with self._lock:
+            self.backend.close()
+            self.size = None
+            self._hwnd = None
+            self._bgra = None
+            self._bgr = None
+
+    def close(self):
+        """關閉上下文"""
+        self.invalidate()
+
+    def _open(self, hwnd, size: Tuple[int, int]):
+        self.backend.close()
+        width, height = size
+        self._bgra = self.backend.open(hwnd, width, height)
+        self._bgr = None
+        self.size = size
+        self._hwnd = hwnd
+        self.generation += 1
+        self.stats['opens'] += 1
+        self.logger.debug(f"🖼️ 建立捕捉資源 {width}x{height} (第 {self.generation} 次)")
+
+
+class ArrayCaptureBackend(CaptureBackend):
+    """以 NumPy 陣列模擬視窗的捕捉後端（hwnd 參數被忽略）"""
+
+    name = "array"
+
+    def __init__(self, source: Union[np.ndarray, Callable[[], Optional[np.ndarray]]]):
+        """
+        Args:
+            source: 固定畫面或每次呼叫回傳畫面的函式（BGR 或 BGRA）
+        """
+        self.source = source
+        self.allocations = 0
+        self._buffer = None
+        self._pending = None
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        return self.source() if callable(self.source) else self.source
+
+    def get_size(self, hwnd) -> Optional[Tuple[int, int]]:
+        # 取得下一張畫面並暫存，尺寸與 render 寫入的內容一致
+        self._pending = self._next_frame()
+        if self._pending is None:
+            return None
+        h, w = self._pending.shape[:2]
+        return (w, h)
+
+    def open(self, hwnd, width: int, height: int) -> np.ndarray:
+        self._buffer = np.empty((height, width, 4), np.uint8)
+        self.allocations += 1
+        return self._buffer
+
+    def render(self, hwnd) -> bool:
+        frame = self._pending
+        if frame is None or self._buffer is None or frame.shape[:2] != self._buffer.shape[:2]:
+            return False
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            np.copyto(self._buffer, frame)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self._buffer)
+        return True
+
+    def close(self):
+        self._buffer = None
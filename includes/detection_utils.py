@@ -0,0 +1,119 @@
+# includes/detection_utils.py - 欄位式怪物檢測結果
+
+"""
+欄位式檢測結果容器：
+- 邊界框、分數、模板索引、軌跡 ID 以 NumPy 陣列儲存，不為每個命中建立字典
+- 提供中心點、相對座標、到指定點距離等向量化計算
+- 可像列表一樣迭代/索引（產生舊格式字典，首次存取時才建立並緩存），相容舊呼叫者
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+
+class Detections:
+    """怪物檢測結果（唯讀陣列，複製成本為常數）"""
+
+    __slots__ = ('boxes', 'scores', 'template_ids', 'track_ids', 'names', 'detection_level', '_dicts')
+
+    def __init__(self, boxes, scores, template_ids, names: Sequence[str],
+                 track_ids=None, detection_level: str = 'fast'):
+        """
+        Args:
+            boxes: (N, 4) 的 (x, y, w, h) 原始畫面座標
+            scores: (N,) 信心度
+            template_ids: (N,) 模板索引（對應 names）
+            names: 模板名稱列表（共用參考，不會被複製）
+            track_ids: (N,) 軌跡 ID，沒有追蹤時為 None
+            detection_level: 檢測層級標記（fast / tracked）
+        """
+        self.boxes = self._readonly(np.asarray(boxes, dtype=np.int32).reshape(-1, 4))
+        self.scores = self._readonly(np.asarray(scores, dtype=np.float32).reshape(-1))
+        self.template_ids = self._readonly(np.asarray(template_ids, dtype=np.int32).reshape(-1))
+        self.track_ids = None if track_ids is None else self._readonly(np.asarray(track_ids, dtype=np.int32).reshape(-1))
+        self.names = names
+        self.detection_level = detection_level
+        self._dicts = None
+
+    @staticmethod
+    def _readonly(array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        return array
+
+    @classmethod
+    def empty(cls, names: Sequence[str] = ()) -> 'Detections':
+        """空的檢測結果"""
+        return cls(np.empty((0, 4), np.int32), np.empty(0, np.float32), np.empty(0, np.int32), names)
+
+    # === 列表相容介面 ===
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __getitem__(self, index):
+        if self._dicts is None and isinstance(index, (int, np.integer)):
+            # 單筆存取只建立該筆字典（例如選中的目標），不產生整個列表
+            count = len(self)
+            if not -count <= index < count:
+                raise IndexError(f"檢測結果索引超出範圍: {index}")
+            return self._make_dict(int(index) % count)
+        return self.to_dicts()[index]
+
+    def __repr__(self) -> str:
+        return f"Detections(count={len(self)}, level={self.detection_level})"
+
+    def copy(self) -> 'Detections':
+        """陣列為唯讀，直接回傳自身（相容 list.copy()）"""
+        return self
+
+    def to_dicts(self) -> List[Dict]:
+        """舊格式的逐筆結果字典列表（首次呼叫時建立並緩存）"""
+        if self._dicts is None:
+            self._dicts = [self._make_dict(i) for i in range(len(self))]
+        return self._dicts
+
+    def _make_dict(self, i: int) -> Dict:
+        """建立第 i 筆的舊格式字典"""
+        x, y, w, h = self.boxes[i].tolist()
+        name = self.names[int(self.template_ids[i])]
+        result = {
+            'bbox': (x, y, w, h),
+            'confidence': float(self.scores[i]),
+            'template_name': name,
+            'name': name,
+            'position': (x + w // 2, y + h // 2),
+            'x': x, 'y': y, 'width': w, 'height': h,
+            'detection_level': self.detection_level
+        }
+        if self.track_ids is not None:
+            result['track_id'] = int(self.track_ids[i])
+        return result
+
+    # === 向量化計算 ===
+
+    def centers(self) -> np.ndarray:
+        """(N, 2) 中心點（與舊格式 'position' 相同的整數除法）"""
+        return np.column_stack((self.boxes[:, 0] + self.boxes[:, 2] // 2,
+                                self.boxes[:, 1] + self.boxes[:, 3] // 2)).astype(np.float32)
+
+    def relative_centers(self, frame_shape) -> np.ndarray:
+        """(N, 2) 相對於畫面寬高的中心點座標 (0-1)"""
+        frame_h, frame_w = frame_shape[:2]
+        return self.centers() / np.array([frame_w, frame_h], dtype=np.float32)
+
+    def distances_to(self, point, frame_shape: Optional[Sequence[int]] = None) -> np.ndarray:
+        """(N,) 中心點到指定點的歐式距離
+
+        Args:
+            point: (x, y)；提供 frame_shape 時為相對座標，否則為像素座標
+            frame_shape: 畫面尺寸，提供時以相對座標計算
+        """
+        centers = self.relative_centers(frame_shape) if frame_shape is not None else self.centers()
+        delta = centers - np.asarray(point, dtype=np.float32)
+        return np.hypot(delta[:, 0], delta[:, 1])
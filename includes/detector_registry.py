@@ -0,0 +1,171 @@
+# includes/detector_registry.py - 全域共用檢測器註冊表
+
+"""
+檢測器註冊表：
+- 以 (檢測器類別, 模板目錄, 設定指紋) 為鍵，同一組參數只建立一個實例
+- 設定指紋只取檢測器實際讀取的區段（類別的 config_sections），整份設定或子區段的呼叫者也能共用
+- 參考計數：每次 acquire 加一，release 減一，歸零時呼叫實例的 close()
+- 熱重載：各實例重新載入自己登記的模板目錄，持有者不需要重新取得
+- 共用實例的設定與模板不應在原地修改（其他持有者仍以原本的鍵取得它）；
+  需要不同模板目錄或設定時，以新的參數 acquire 另一個實例並釋放舊的
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from includes.log_utils import get_logger
+
+
+class DetectorRegistry:
+    """執行緒安全的共用檢測器註冊表"""
+
+    def __init__(self):
+        self.logger = get_logger("DetectorRegistry")
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _config_fingerprint(config) -> str:
+        """設定內容指紋（設定內容相同的呼叫者共用同一實例）"""
+        try:
+            payload = json.dumps(config or {}, sort_keys=True, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            payload = repr(config)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _config_key(factory: Callable, config, config_key: Optional[Callable] = None):
+        """取出決定實例內容的設定部分（預設為 factory.config_sections 列出的區段）"""
+        config = config or {}
+        if config_key is not None:
+            return config_key(config)
+        sections = getattr(factory, 'config_sections', None)
+        if sections is None or not isinstance(config, dict):
+            return config
+        return {name: config.get(name) for name in sections}
+
+    @staticmethod
+    def _factory_name(factory: Callable) -> str:
+        return f"{getattr(factory, '__module__', '')}.{getattr(factory, '__qualname__', repr(factory))}"
+
+    def acquire(self, factory: Callable, config=None, template_dir: Optional[str] = None,
+                config_key: Optional[Callable] = None):
+        """取得共用檢測器（不存在時以 factory(template_dir=..., config=...) 建立）
+
+        Args:
+            factory: 檢測器類別或建構函式
+            config: 設定字典
+            template_dir: 模板目錄（None 表示使用建構函式預設值）
+            config_key: 從設定取出比對用部分的函式（None 時使用 factory.config_sections）
+
+        Returns:
+            共用的檢測器實例
+        """
+        fingerprint = self._config_fingerprint(self._config_key(factory, config, config_key))
+        key = (self._factory_name(factory), template_dir, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refcount'] += 1
+                self.logger.debug(f"♻️ 共用檢測器 {key[0]}（參考數 {entry['refcount']}）")
+                return entry['instance']
+
+            kwargs = {'config': config}
+            if template_dir is not None:
+                kwargs['template_dir'] = template_dir
+            instance = factory(**kwargs)
+            self._entries[key] = {
+                'instance': instance,
+                'refcount': 1,
+                # 實例實際使用的模板目錄（熱重載以此比對，不會改動其他目錄的實例）
+                'template_dir': template_dir if template_dir is not None else getattr(instance, 'template_dir', None)
+            }
+            self.logger.info(f"🆕 建立共用檢測器 {key[0]}")
+            return instance
+
+    def release(self, instance) -> bool:
+        """釋放一次參考，參考數歸零時移除並關閉實例
+
+        Returns:
+            是否找到該實例
+        """
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry['instance'] is not instance:
+                    continue
+                entry['refcount'] -= 1
+                if entry['refcount'] <= 0:
+                    del self._entries[key]
+                    close = getattr(instance, 'close', None)
+                    if callable(close):
+                        try:
+                            close()
+                        except Exception as e:
+                            self.logger.warning(f"⚠️ 關閉檢測器失敗 {key[0]}: {e}")
+                    self.logger.info(f"🗑️ 已釋放共用檢測器 {key[0]}")
+                return True
+        return False
+
+    def refcount(self, instance) -> int:
+        """實例目前的參考數（不是由註冊表建立的實例為 0）"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['instance'] is instance:
+                    return entry['refcount']
+        return 0
+
+    def reload(self, factory: Optional[Callable] = None, template_dir: Optional[str] = None) -> int:
+        """熱重載：存活實例重新載入各自的模板目錄
+
+        Args:
+            factory: 只重載此類別的實例（None = 全部）
+            template_dir: 只重載登記為此模板目錄的實例（None = 全部）
+
+        Returns:
+            重載的實例數量
+        """
+        name = self._factory_name(factory) if factory is not None else None
+        target_dir = os.path.normpath(template_dir) if template_dir is not None else None
+        reloaded = 0
+        with self._lock:
+            for key, entry in self._entries.items():
+                if name is not None and key[0] != name:
+                    continue
+                entry_dir = entry.get('template_dir')
+                if target_dir is not None and (entry_dir is None or os.path.normpath(entry_dir) != target_dir):
+                    continue
+                reload_templates = getattr(entry['instance'], 'reload_templates', None)
+                if not callable(reload_templates):
+                    continue
+                try:
+                    if reload_templates() is False:
+                        continue
+                except Exception as e:
+                    self.logger.error(f"❌ 熱重載失敗 {key[0]}@{entry_dir}: {e}")
+                    continue
+                reloaded += 1
+
+        if reloaded:
+            self.logger.info(f"🔄 已熱重載 {reloaded} 個檢測器")
+        return reloaded
+
+    def get_stats(self) -> Dict[str, int]:
+        """各共用檢測器的參考數（鍵為 類別@模板目錄#設定指紋前8碼）"""
+        with self._lock:
+            return {f"{key[0]}@{key[1]}#{key[2][:8]}": entry['refcount'] for key, entry in self._entries.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_detector_registry() -> DetectorRegistry:
+    """取得全域檢測器註冊表"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DetectorRegistry()
+    return _registry
@@ -0,0 +1,168 @@
+# includes/frame_bus_utils.py - 單一生產者畫面匯流排
+
+"""
+畫面匯流排：
+- 一個捕捉執行緒依固定間隔抓圖，畫面附上遞增序號與時間戳後放入環形緩衝
+- 所有消費者共用同一張畫面（唯讀陣列），不會各自觸發 PrintWindow
+- 消費者可讀取最新畫面，或等待比自己上次看到的序號更新的畫面
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+import numpy as np
+from includes.log_utils import get_logger
+
+
+@dataclass
+class FramePacket:
+    """匯流排上的一張畫面"""
+    seq: int
+    timestamp: float
+    frame: np.ndarray  # 唯讀，需要修改時請先 copy()
+
+    @property
+    def age(self) -> float:
+        """畫面距今秒數"""
+        return time.time() - self.timestamp
+
+
+class FrameSubscription:
+    """單一消費者的讀取游標（記住上次讀到的序號）"""
+
+    def __init__(self, bus: 'FrameBus', name: str):
+        self.bus = bus
+        self.name = name
+        self.last_seq = 0
+
+    def read(self, wait: bool = False, timeout: float = 0.1) -> Optional[FramePacket]:
+        """讀取比上次更新的畫面
+
+        Args:
+            wait: 沒有新畫面時是否等待
+            timeout: 最長等待秒數
+
+        Returns:
+            新畫面，沒有新畫面時回傳 None
+        """
+        self.bus.note_request()
+        packet = self.bus.wait_next(self.last_seq, timeout) if wait else self.bus.latest()
+        if packet is None or packet.seq <= self.last_seq:
+            return None
+        self.last_seq = packet.seq
+        return packet
+
+
+class FrameBus:
+    """單一捕捉執行緒 + 環形緩衝的畫面匯流排"""
+
+    def __init__(self, capture_func: Callable[[], Optional[np.ndarray]],
+                 interval: float = 0.02, ring_size: int = 4,
+                 interval_func: Optional[Callable[[], float]] = None,
+                 request_callback: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            capture_func: 實際抓圖函式（只在捕捉執行緒內呼叫）
+            interval: 捕捉間隔（秒）
+            ring_size: 保留最近幾張畫面
+            interval_func: 動態捕捉間隔（提供時取代 interval）
+            request_callback: 消費者讀取畫面時呼叫（用於估計需求頻率）
+        """
+        self.logger = get_logger("FrameBus")
+        self.capture_func = capture_func
+        self.interval = interval
+        self.interval_func = interval_func
+        self.request_callback = request_callback
+        self._ring = deque(maxlen=max(1, ring_size))
+        self._condition = threading.Condition()
+        self._seq = 0
+        self._running = False
+        self._thread = None
+        self.stats = {'captured': 0, 'failed': 0, 'last_capture_time': 0.0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """啟動捕捉執行緒（重複呼叫安全）"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="FrameBus", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📡 畫面匯流排已啟動 (間隔 {self.interval * 1000:.0f}ms)")
+
+    def stop(self, timeout: float = 1.0):
+        """停止捕捉執行緒並喚醒等待中的消費者"""
+        if not self._running:
+            return
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        self.logger.info("📡 畫面匯流排已停止")
+
+    def note_request(self):
+        """記錄一次消費者讀取"""
+        if self.request_callback is not None:
+            self.request_callback()
+
+    def subscribe(self, name: str = "") -> FrameSubscription:
+        """建立消費者讀取游標"""
+        return FrameSubscription(self, name)
+
+    def latest(self) -> Optional[FramePacket]:
+        """最新的畫面（沒有時回傳 None）"""
+        with self._condition:
+            return self._ring[-1] if self._ring else None
+
+    def wait_next(self, after_seq: int, timeout: float = 0.1) -> Optional[FramePacket]:
+        """等待序號大於 after_seq 的畫面，逾時回傳目前最新畫面"""
+        deadline = time.time() + timeout
+        with self._condition:
+            while self._running and (not self._ring or self._ring[-1].seq <= after_seq):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return self._ring[-1] if self._ring else None
+
+    def publish(self, frame: np.ndarray) -> FramePacket:
+        """放入一張畫面（捕捉執行緒使用，也可供外部畫面來源推送）
+
+        發布的是唯讀視圖，不改動來源陣列本身的可寫旗標；來源之後不可再原地改寫已發布的畫面
+        """
+        view = frame.view()
+        view.flags.writeable = False
+        with self._condition:
+            self._seq += 1
+            packet = FramePacket(self._seq, time.time(), view)
+            self._ring.append(packet)
+            self._condition.notify_all()
+        return packet
+
+    def _capture_loop(self):
+        last_source = None
+        while self._running:
+            start = time.time()
+            try:
+                frame = self.capture_func()
+                if frame is not None and frame is not last_source:
+                    # 來源回傳的是上一張畫面（捕捉失敗/重播未到時間）時不重複發布
+                    self.publish(frame)
+                    last_source = frame
+                    self.stats['captured'] += 1
+                elif frame is None:
+                    self.stats['failed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.logger.debug(f"畫面匯流排捕捉失敗: {e}")
+            elapsed = time.time() - start
+            self.stats['last_capture_time'] = elapsed
+            interval = self.interval_func() if self.interval_func is not None else self.interval
+            time.sleep(max(0.0, interval - elapsed))
@@ -0,0 +1,182 @@
+# includes/frame_source_utils.py - 畫面來源介面
+
+"""
+畫面來源介面：
+- 所有畫面來源（視窗捕捉、錄影/錄製畫面重播）都實作 _grab_frame_direct()
+- grab_frame()、畫面匯流排、捕捉資訊等共用行為集中在基底類別
+- 偵測/追蹤/戰鬥只依賴這個介面，不需要知道畫面從哪裡來
+- 可選的捕捉頻率控制：依消費者需求與實測捕捉成本，在最短/最長間隔之間調整
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+import numpy as np
+from includes.frame_bus_utils import FrameBus, FrameSubscription
+from includes.log_utils import get_logger
+
+
+class CaptureRateController:
+    """捕捉頻率控制：需求頻率與捕捉成本決定目標間隔"""
+
+    def __init__(self, cache_duration: float = 0.05, min_interval: float = 0.02,
+                 max_interval: float = 0.1, max_duty: float = 0.5, smoothing: float = 0.2):
+        """
+        Args:
+            cache_duration: 緩存畫面最長重用時間（秒）
+            min_interval: 最短捕捉間隔（最高頻率）
+            max_interval: 最長捕捉間隔（沒有需求時的最低頻率）
+            max_duty: 捕捉時間最多佔用的比例（捕捉越慢間隔越長）
+            smoothing: 需求/成本估計的平滑係數
+        """
+        self.cache_duration = cache_duration
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.max_duty = max_duty if max_duty > 0 else 1.0
+        self.smoothing = smoothing
+        self.demand_interval = self.max_interval
+        self.capture_cost = 0.0
+        self._last_request = None
+
+    def note_request(self, now: Optional[float] = None):
+        """記錄一次畫面需求（所有消費者合計）"""
+        now = time.time() if now is None else now
+        if self._last_request is not None:
+            dt = min(now - self._last_request, self.max_interval * 2)
+            self.demand_interval += (dt - self.demand_interval) * self.smoothing
+        self._last_request = now
+
+    def note_capture(self, cost: float):
+        """記錄一次實際捕捉耗時"""
+        self.capture_cost += (cost - self.capture_cost) * self.smoothing
+
+    def target_interval(self) -> float:
+        """目前的目標捕捉間隔"""
+        interval = max(self.demand_interval, self.capture_cost / self.max_duty)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def reuse_window(self) -> float:
+        """緩存畫面在這段時間內直接重用"""
+        return min(self.target_interval(), self.cache_duration)
+
+
+class FrameSource:
+    """畫面來源基底類別 - 子類別必須實作 _grab_frame_direct"""
+
+    name = "base"
+
+    def __init__(self, logger_name: Optional[str] = None):
+        self.logger = get_logger(logger_name or self.__class__.__name__)
+        self.frame_cache = None
+        self.cache_timestamp = 0
+        self.frame_bus = None
+        self.rate_controller = None
+        self._capture_lock = threading.Lock()
+
+    def configure_rate_limit(self, cache_duration: float = 0.05, min_interval: float = 0.02,
+                             max_interval: float = 0.1, max_duty: float = 0.5):
+        """啟用捕捉頻率控制（多個呼叫者不會讓實際捕捉次數倍增）"""
+        self.rate_controller = CaptureRateController(cache_duration, min_interval, max_interval, max_duty)
+
+    def _grab_frame_direct(self) -> Optional[np.ndarray]:
+        """實際取得一張新畫面（失敗時回傳 None）"""
+        raise NotImplementedError("子類別必須實作 _grab_frame_direct")
+
+    def _store_frame(self, frame: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """記錄最後一張成功取得的畫面，失敗時回傳緩存"""
+        if frame is None:
+            return self.frame_cache
+        self.frame_cache = frame
+        self.cache_timestamp = time.time()
+        return frame
+
+    def _capture(self) -> Optional[np.ndarray]:
+        """實際捕捉並記錄耗時"""
+        start = time.time()
+        frame = self._grab_frame_direct()
+        if self.rate_controller is not None:
+            self.rate_controller.note_capture(time.time() - start)
+        return frame
+
+    def _note_request(self):
+        if self.rate_controller is not None:
+            self.rate_controller.note_request()
+
+    def grab_frame(self) -> Optional[np.ndarray]:
+        """取得畫面副本（呼叫者可自由修改，不會影響緩存或匯流排上的畫面）
+
+        匯流排運行時複製最新畫面；頻率控制時在重用時間內複製緩存，否則實際捕捉後複製
+        """
+        self._note_request()
+        if self.frame_bus is not None and self.frame_bus.is_running:
+            packet = self.frame_bus.latest() or self.frame_bus.wait_next(0, timeout=0.5)
+            return self._copy_frame(packet.frame if packet is not None else self.frame_cache)
+        # 同時呼叫時只有一個執行緒實際捕捉，其餘取得剛捕捉的緩存
+        with self._capture_lock:
+            if (self.rate_controller is not None and self.frame_cache is not None and
+                    self.get_frame_age() < self.rate_controller.reuse_window()):
+                return self.frame_cache.copy()
+            return self._copy_frame(self._capture())
+
+    @staticmethod
+    def _copy_frame(frame: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        return frame.copy() if frame is not None else None
+
+    def get_frame_age(self) -> float:
+        """最新畫面距今秒數（沒有畫面時為無限大）"""
+        if self.frame_bus is not None and self.frame_bus.is_running:
+            packet = self.frame_bus.latest()
+            if packet is not None:
+                return packet.age
+        if self.frame_cache is None:
+            return float('inf')
+        return time.time() - self.cache_timestamp
+
+    def start_frame_bus(self, interval: float = 0.02, ring_size: int = 4) -> FrameBus:
+        """啟動畫面匯流排（重複呼叫安全；有頻率控制時間隔由控制器決定）"""
+        if self.frame_bus is None:
+            self.frame_bus = FrameBus(
+                self._capture, interval=interval, ring_size=ring_size,
+                interval_func=self.rate_controller.target_interval if self.rate_controller is not None else None,
+                request_callback=self._note_request)
+        self.frame_bus.start()
+        return self.frame_bus
+
+    def stop_frame_bus(self):
+        """停止畫面匯流排，之後 grab_frame 恢復直接取得"""
+        if self.frame_bus is not None:
+            self.frame_bus.stop()
+
+    def subscribe_frames(self, name: str = "") -> Optional[FrameSubscription]:
+        """訂閱畫面匯流排（未啟動時回傳 None）"""
+        if self.frame_bus is None or not self.frame_bus.is_running:
+            return None
+        return self.frame_bus.subscribe(name)
+
+    def force_reconnect(self) -> bool:
+        """重新連接來源（預設不需要）"""
+        return True
+
+    def get_screen_resolution(self) -> Dict[str, int]:
+        """畫面解析度（以最後一張畫面為準）"""
+        if self.frame_cache is not None:
+            h, w = self.frame_cache.shape[:2]
+            return {'width': w, 'height': h, 'left': 0, 'top': 0}
+        return {'width': 1920, 'height': 1080, 'left': 0, 'top': 0}
+
+    def get_capture_info(self) -> Dict:
+        """來源資訊"""
+        return {
+            'source': self.name,
+            'is_connected': True,  # 預設來源隨時可用，視窗捕捉/重播來源自行覆寫
+            'has_cache': self.frame_cache is not None,
+            'frame_age': self.get_frame_age(),
+            'target_interval': self.rate_controller.target_interval() if self.rate_controller is not None else None,
+            'frame_bus_running': self.frame_bus is not None and self.frame_bus.is_running,
+            'frame_bus_stats': dict(self.frame_bus.stats) if self.frame_bus is not None else {}
+        }
+
+    def cleanup(self):
+        """清理資源"""
+        self.stop_frame_bus()
+        self.frame_cache = None
@@ -0,0 +1,117 @@
+# includes/kalman_utils.py - 角色位置卡爾曼濾波
+
+"""
+等速模型卡爾曼濾波（相對座標 0-1）：
+- 狀態為 (x, y, vx, vy)，同時估計位置與速度
+- 漏檢的幀只做預測，不需要回傳舊位置
+- 提供共變異數，呼叫者可依不確定度決定是否信任預測
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+class PositionKalmanFilter:
+    """二維等速卡爾曼濾波器"""
+
+    def __init__(self, process_noise: float = 2.0, measurement_noise: float = 0.003,
+                 max_prediction_time: float = 0.5, reset_distance: float = 0.2):
+        """
+        Args:
+            process_noise: 加速度標準差（相對座標/秒²），越大越快跟上移動
+            measurement_noise: 觀測標準差（相對座標）
+            max_prediction_time: 沒有觀測時最多預測多久（秒），超過則視為遺失
+            reset_distance: 觀測與預測差距超過此值時直接重置（傳送/換地圖）
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_prediction_time = max_prediction_time
+        self.reset_distance = reset_distance
+
+        self._H = np.hstack((np.eye(2), np.zeros((2, 2))))
+        self._R = np.eye(2) * measurement_noise ** 2
+        self.reset()
+
+    def reset(self):
+        """清除狀態（下一次觀測會重新初始化）"""
+        self.state = np.zeros(4)
+        self.covariance = np.eye(4)
+        self.last_update = None
+        self.initialized = False
+
+    def _initialize(self, measurement: np.ndarray, now: float):
+        self.state = np.array([measurement[0], measurement[1], 0.0, 0.0])
+        # 初始速度未知：給較大的速度不確定度
+        self.covariance = np.diag([self.measurement_noise ** 2] * 2 + [1.0, 1.0])
+        self.last_update = now
+        self.initialized = True
+
+    def _transition(self, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+        """狀態轉移矩陣與過程雜訊（白雜訊加速度模型）"""
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        q = self.process_noise ** 2
+        dt2, dt3, dt4 = dt * dt, dt ** 3, dt ** 4
+        Q = np.zeros((4, 4))
+        Q[0, 0] = Q[1, 1] = dt4 / 4 * q
+        Q[0, 2] = Q[2, 0] = Q[1, 3] = Q[3, 1] = dt3 / 2 * q
+        Q[2, 2] = Q[3, 3] = dt2 * q
+        return F, Q
+
+    def _predict_state(self, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        dt = max(0.0, now - self.last_update)
+        F, Q = self._transition(dt)
+        return F @ self.state, F @ self.covariance @ F.T + Q
+
+    def update(self, measurement, now: float) -> Tuple[float, float]:
+        """加入一筆位置觀測
+
+        Returns:
+            濾波後的位置
+        """
+        z = np.asarray(measurement, dtype=np.float64)[:2]
+        if not self.initialized:
+            self._initialize(z, now)
+            return self.position
+
+        state, covariance = self._predict_state(now)
+        innovation = z - self._H @ state
+        if np.hypot(innovation[0], innovation[1]) > self.reset_distance:
+            # 位置跳變（傳送、換地圖）：不做平滑直接重置
+            self._initialize(z, now)
+            return self.position
+
+        S = self._H @ covariance @ self._H.T + self._R
+        K = covariance @ self._H.T @ np.linalg.inv(S)
+        self.state = state + K @ innovation
+        self.covariance = (np.eye(4) - K @ self._H) @ covariance
+        self.last_update = now
+        return self.position
+
+    def predict(self, now: float) -> Optional[Tuple[float, float]]:
+        """預測指定時間的位置（不改變濾波器狀態），遺失時回傳 None"""
+        if not self.is_valid(now):
+            return None
+        state, _ = self._predict_state(now)
+        return (float(np.clip(state[0], 0.0, 1.0)), float(np.clip(state[1], 0.0, 1.0)))
+
+    def predict_covariance(self, now: float) -> Optional[np.ndarray]:
+        """預測指定時間的位置共變異數 (2, 2)"""
+        if not self.initialized:
+            return None
+        _, covariance = self._predict_state(now)
+        return covariance[:2, :2]
+
+    def is_valid(self, now: float) -> bool:
+        """是否有可用的估計（已初始化且距離上次觀測未超過預測上限）"""
+        return self.initialized and now - self.last_update <= self.max_prediction_time
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        """最近一次更新後的位置"""
+        return (float(np.clip(self.state[0], 0.0, 1.0)), float(np.clip(self.state[1], 0.0, 1.0)))
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        """估計速度（相對座標/秒）"""
+        return (float(self.state[2]), float(self.state[3]))
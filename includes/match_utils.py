@@ -0,0 +1,159 @@
+# includes/match_utils.py - 模板匹配結果處理工具
+
+"""
+模板匹配後處理的共用工具：
+- 從 TM_CCOEFF_NORMED 相關圖中向量化取出所有局部峰值
+- NumPy 版非極大值抑制 (NMS)，合併跨模板的重疊框
+- 搜索區域矩形的合併與交集
+- 模板間的正規化相關相似度（載入時去除重複模板）
+"""
+
+import cv2
+import numpy as np
+from typing import Tuple
+
+
+class MatchUtils:
+    """模板匹配後處理工具類（無狀態靜態方法）"""
+
+    @staticmethod
+    def find_local_peaks(score_map: np.ndarray, threshold: float, max_peaks: int,
+                         neighborhood: int = 3) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """取出相關圖中所有超過閾值的局部最大值
+
+        Args:
+            score_map: cv2.matchTemplate 輸出的相關圖 (float32)
+            threshold: 最低分數
+            max_peaks: 最多回傳的峰值數量（取分數最高者）
+            neighborhood: 局部最大值的鄰域大小（像素）
+
+        Returns:
+            (xs, ys, scores) 三個一維陣列，依分數由高到低排序
+        """
+        empty = (np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float32))
+        if score_map is None or score_map.size == 0 or max_peaks <= 0:
+            return empty
+
+        # 先用 minMaxLoc 快速排除沒有任何命中的相關圖（與單峰值版本成本相同）
+        _, max_val, _, _ = cv2.minMaxLoc(score_map)
+        if max_val < threshold:
+            return empty
+
+        # 局部最大值：等於鄰域最大值（膨脹結果）且超過閾值
+        size = max(3, int(neighborhood) | 1)
+        kernel = np.ones((size, size), np.uint8)
+        dilated = cv2.dilate(score_map, kernel)
+        peak_mask = (score_map >= threshold) & (score_map >= dilated)
+
+        ys, xs = np.nonzero(peak_mask)
+        scores = score_map[ys, xs]
+
+        # 只保留分數最高的 max_peaks 個
+        if scores.size > max_peaks:
+            top = np.argpartition(-scores, max_peaks - 1)[:max_peaks]
+            xs, ys, scores = xs[top], ys[top], scores[top]
+
+        order = np.argsort(-scores, kind='stable')
+        return xs[order].astype(np.int32), ys[order].astype(np.int32), scores[order].astype(np.float32)
+
+    @staticmethod
+    def non_max_suppression(boxes: np.ndarray, scores: np.ndarray,
+                            iou_threshold: float = 0.3, max_count: int = 20) -> np.ndarray:
+        """貪婪式非極大值抑制
+
+        Args:
+            boxes: (N, 4) 陣列，格式 (x, y, w, h)
+            scores: (N,) 分數
+            iou_threshold: 重疊比例超過此值的框會被抑制
+            max_count: 最多保留的框數
+
+        Returns:
+            保留框的索引陣列（依分數由高到低）
+        """
+        if boxes is None or len(boxes) == 0 or max_count <= 0:
+            return np.empty(0, np.int64)
+
+        boxes = np.asarray(boxes, dtype=np.float32)
+        x1 = boxes[:, 0]
+        y1 = boxes[:, 1]
+        x2 = x1 + boxes[:, 2]
+        y2 = y1 + boxes[:, 3]
+        areas = np.maximum(boxes[:, 2], 0) * np.maximum(boxes[:, 3], 0)
+
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        keep = []
+        while order.size > 0 and len(keep) < max_count:
+            i = order[0]
+            keep.append(i)
+            rest = order[1:]
+            if rest.size == 0:
+                break
+
+            inter_w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+            inter_h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+            inter = inter_w * inter_h
+            union = areas[i] + areas[rest] - inter
+            iou = np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+            order = rest[iou <= iou_threshold]
+
+        return np.asarray(keep, dtype=np.int64)
+
+    @staticmethod
+    def merge_overlapping_rects(rects):
+        """合併互相重疊的矩形 (x, y, w, h)，回傳合併後的矩形列表"""
+        merged = [list(r) for r in rects]
+        changed = True
+        while changed:
+            changed = False
+            result = []
+            while merged:
+                x, y, w, h = merged.pop()
+                i = 0
+                while i < len(merged):
+                    ox, oy, ow, oh = merged[i]
+                    if x < ox + ow and ox < x + w and y < oy + oh and oy < y + h:
+                        nx, ny = min(x, ox), min(y, oy)
+                        w = max(x + w, ox + ow) - nx
+                        h = max(y + h, oy + oh) - ny
+                        x, y = nx, ny
+                        merged.pop(i)
+                        changed = True
+                    else:
+                        i += 1
+                result.append([x, y, w, h])
+            merged = result
+        return [tuple(r) for r in merged]
+
+    @staticmethod
+    def intersect_rects(a, b):
+        """兩個矩形 (x, y, w, h) 的交集，沒有交集時回傳 None"""
+        x1 = max(a[0], b[0])
+        y1 = max(a[1], b[1])
+        x2 = min(a[0] + a[2], b[0] + b[2])
+        y2 = min(a[1] + a[3], b[1] + b[3])
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    @staticmethod
+    def template_similarity(a: np.ndarray, b: np.ndarray, max_size_diff: float = 0.1,
+                            max_shift: float = 0.1) -> float:
+        """兩個灰階模板的正規化相關相似度（TM_CCOEFF_NORMED，容許小幅位移）
+
+        尺寸差異超過 max_size_diff 比例時視為不相似（回傳 0）。
+        b 的四周各裁掉 max_shift 比例後在 a 中滑動匹配，取最高分，
+        可容忍動畫幀之間的小幅對齊偏移。
+        """
+        ah, aw = a.shape[:2]
+        bh, bw = b.shape[:2]
+        if abs(ah - bh) > max(ah, bh) * max_size_diff or abs(aw - bw) > max(aw, bw) * max_size_diff:
+            return 0.0
+
+        crop_y = max(int(bh * max_shift), (bh - ah + 1) // 2, 0)
+        crop_x = max(int(bw * max_shift), (bw - aw + 1) // 2, 0)
+        core = b[crop_y:bh - crop_y, crop_x:bw - crop_x]
+        if core.size == 0 or core.shape[0] > ah or core.shape[1] > aw:
+            return 0.0
+        _, max_val, _, _ = cv2.minMaxLoc(cv2.matchTemplate(a, core, cv2.TM_CCOEFF_NORMED))
+        return float(max_val)
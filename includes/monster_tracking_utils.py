@@ -0,0 +1,142 @@
+# includes/monster_tracking_utils.py - 怪物時序追蹤工具
+
+"""
+怪物時序追蹤：
+- 每隻怪物維護一條軌跡（ID、邊界框、速度、最後出現時間）
+- 下一幀只在預測位置附近重新匹配該軌跡的模板
+- 軌跡遺失或到達間隔時才要求全畫面檢測
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class MonsterTrack:
+    """單一怪物軌跡"""
+    track_id: int
+    bbox: Tuple[float, float, float, float]  # (x, y, w, h) 原始畫面座標
+    template_id: int
+    confidence: float
+    last_seen: float
+    velocity: Tuple[float, float] = (0.0, 0.0)  # 像素/秒
+    misses: int = 0
+
+    def predicted_bbox(self, now: float) -> Tuple[float, float, float, float]:
+        """依等速模型預測目前的邊界框"""
+        dt = max(0.0, now - self.last_seen)
+        x, y, w, h = self.bbox
+        return (x + self.velocity[0] * dt, y + self.velocity[1] * dt, w, h)
+
+    def center(self) -> Tuple[float, float]:
+        """邊界框中心點"""
+        x, y, w, h = self.bbox
+        return (x + w / 2, y + h / 2)
+
+
+class MonsterTracker:
+    """怪物軌跡管理器（不負責匹配，只處理軌跡狀態與資料關聯）"""
+
+    def __init__(self, full_detect_interval: float = 0.5, max_misses: int = 2,
+                 velocity_smoothing: float = 0.5):
+        self.full_detect_interval = full_detect_interval
+        self.max_misses = max_misses
+        self.velocity_smoothing = velocity_smoothing
+
+        self.tracks: List[MonsterTrack] = []
+        self._next_track_id = 1
+        self._last_full_detection = 0.0
+        self._track_lost = False
+
+    def reset(self):
+        """清除所有軌跡（模板集合變更時呼叫）"""
+        self.tracks = []
+        self._last_full_detection = 0.0
+        self._track_lost = False
+
+    def needs_full_detection(self, now: float) -> bool:
+        """是否需要全畫面檢測：沒有軌跡、有軌跡遺失或到達檢測間隔"""
+        return (not self.tracks or self._track_lost or
+                now - self._last_full_detection >= self.full_detect_interval)
+
+    def update_track(self, track: MonsterTrack, bbox, confidence: float, now: float,
+                     template_id: Optional[int] = None):
+        """以新的觀測更新軌跡（含速度估計）"""
+        dt = now - track.last_seen
+        if dt > 1e-3:
+            vx = (bbox[0] - track.bbox[0]) / dt
+            vy = (bbox[1] - track.bbox[1]) / dt
+            a = self.velocity_smoothing
+            track.velocity = (track.velocity[0] * (1 - a) + vx * a,
+                              track.velocity[1] * (1 - a) + vy * a)
+        track.bbox = tuple(float(v) for v in bbox)
+        track.confidence = float(confidence)
+        track.last_seen = now
+        track.misses = 0
+        if template_id is not None:
+            track.template_id = int(template_id)
+
+    def mark_missed(self, track: MonsterTrack):
+        """本幀未能在預測區域找到該軌跡"""
+        track.misses += 1
+
+    def prune(self):
+        """移除連續遺失過多次的軌跡"""
+        alive = [t for t in self.tracks if t.misses <= self.max_misses]
+        if len(alive) != len(self.tracks):
+            self._track_lost = True
+        self.tracks = alive
+
+    def associate(self, boxes: np.ndarray, scores: np.ndarray, template_ids: np.ndarray, now: float):
+        """將全畫面檢測結果關聯到現有軌跡，未關聯的檢測建立新軌跡
+
+        以預測中心點距離做貪婪配對（分數高的檢測優先），距離上限為框的較大邊長。
+        """
+        self._last_full_detection = now
+        self._track_lost = False
+
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        unmatched_tracks = list(self.tracks)
+        matched_tracks = []
+
+        for i in order:
+            x, y, w, h = (float(v) for v in boxes[i])
+            cx, cy = x + w / 2, y + h / 2
+
+            best_track = None
+            best_dist = max(w, h)
+            for track in unmatched_tracks:
+                px, py, pw, ph = track.predicted_bbox(now)
+                dist = ((px + pw / 2 - cx) ** 2 + (py + ph / 2 - cy) ** 2) ** 0.5
+                if dist <= best_dist:
+                    best_dist = dist
+                    best_track = track
+
+            if best_track is not None:
+                unmatched_tracks.remove(best_track)
+                self.update_track(best_track, (x, y, w, h), scores[i], now, template_ids[i])
+                matched_tracks.append(best_track)
+            else:
+                new_track = MonsterTrack(
+                    track_id=self._next_track_id,
+                    bbox=(x, y, w, h),
+                    template_id=int(template_ids[i]),
+                    confidence=float(scores[i]),
+                    last_seen=now
+                )
+                self._next_track_id += 1
+                matched_tracks.append(new_track)
+
+        # 全畫面檢測沒找到的軌跡視為遺失一次
+        for track in unmatched_tracks:
+            self.mark_missed(track)
+
+        self.tracks = matched_tracks + unmatched_tracks
+        self.prune()
+        # 全畫面檢測剛完成，遺失的軌跡不需要立即再觸發全畫面檢測
+        self._track_lost = False
+
+    def visible_tracks(self, now: float) -> List[MonsterTrack]:
+        """本幀有被觀測到的軌跡"""
+        return [t for t in self.tracks if t.last_seen == now]
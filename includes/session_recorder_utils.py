@@ -0,0 +1,303 @@
+# includes/session_recorder_utils.py - 壓縮錄製畫面與處理結果
+
+"""
+錄製工作階段：
+- 呼叫端只把畫面與處理結果放進有上限的佇列，佇列滿時直接丟棄（不阻塞主循環）
+- 背景執行緒做壓縮：關鍵幀存完整畫面，其餘只存與上一張不同的區塊（畫面大多靜止）
+- 分塊存成 chunk_XXXXXX.npz，每塊以關鍵幀開頭，可直接跳到任一張畫面
+- index.json 記錄所有分塊，每寫完一塊就更新（中途中斷也能讀取已完成的部分）
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from includes.log_utils import get_logger
+
+SESSION_VERSION = 1
+
+
+def _to_jsonable(value: Any) -> Any:
+    """將處理結果轉成可寫入 JSON 的格式"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if callable(getattr(value, 'to_dicts', None)):
+        return _to_jsonable(value.to_dicts())
+    return str(value)
+
+
+class SessionRecorder:
+    """背景錄製器（佇列有上限，滿時丟棄）"""
+
+    def __init__(self, output_dir: str, chunk_size: int = 120, keyframe_interval: int = 30,
+                 tile_size: int = 32, queue_size: int = 16, max_chunk_mb: float = 64.0):
+        """
+        Args:
+            output_dir: 工作階段輸出資料夾
+            chunk_size: 每個分塊最多幾張畫面
+            keyframe_interval: 每幾張畫面存一次完整畫面
+            tile_size: 差異區塊邊長（像素）
+            queue_size: 等待寫入的畫面上限，超過時丟棄新畫面
+            max_chunk_mb: 分塊未壓縮資料上限，超過時提前寫出
+        """
+        self.logger = get_logger("SessionRecorder")
+        self.output_dir = output_dir
+        self.chunk_size = max(1, chunk_size)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.tile_size = max(8, tile_size)
+        self.max_chunk_bytes = int(max_chunk_mb * 1024 * 1024)
+
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = None
+        self._running = False
+        self.stats = {'recorded': 0, 'dropped': 0, 'keyframes': 0, 'chunks': 0, 'bytes_written': 0}
+
+        # 寫入執行緒狀態
+        self._chunks: List[Dict] = []
+        self._chunk_entries: Dict[str, np.ndarray] = {}
+        self._chunk_meta: List[str] = []
+        self._chunk_bytes = 0
+        self._chunk_first_frame = 0
+        self._frame_index = 0
+        self._prev_padded = None
+        self._since_keyframe = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """建立輸出資料夾並啟動寫入執行緒"""
+        if self._running:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="SessionRecorder", daemon=True)
+        self._thread.start()
+        self.logger.info(f"⏺️ 開始錄製: {self.output_dir}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止錄製：寫完佇列中的畫面與最後一個分塊（timeout=None 表示等到寫完）"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)  # 阻塞放入：確保寫入執行緒一定收到結束訊號
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.logger.info(f"⏹️ 錄製結束: {self.stats['recorded']} 張，丟棄 {self.stats['dropped']} 張，"
+                         f"{self.stats['bytes_written'] / 1024 / 1024:.1f} MB")
+
+    def record(self, frame: np.ndarray, outputs: Optional[Dict] = None,
+               timings: Optional[Dict] = None, timestamp: Optional[float] = None) -> bool:
+        """放入一張畫面與處理結果（不阻塞；佇列滿時丟棄並回傳 False）
+
+        唯讀畫面（畫面匯流排）直接共用，可寫入的畫面會先複製。
+        """
+        if not self._running or frame is None:
+            return False
+        if frame.flags.writeable:
+            frame = frame.copy()
+        try:
+            self._queue.put_nowait((timestamp if timestamp is not None else time.time(), frame, outputs, timings))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    # === 寫入執行緒 ===
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._encode_frame(*item)
+            except Exception as e:
+                self.logger.error(f"錄製寫入失敗: {e}")
+        try:
+            self._flush_chunk()
+        except Exception as e:
+            self.logger.error(f"錄製寫入失敗: {e}")
+
+    def _pad(self, frame: np.ndarray) -> np.ndarray:
+        """補齊到區塊邊長的整數倍"""
+        t = self.tile_size
+        h, w = frame.shape[:2]
+        pad_h, pad_w = (-h) % t, (-w) % t
+        if pad_h == 0 and pad_w == 0:
+            return frame
+        return np.pad(frame, ((0, pad_h), (0, pad_w), (0, 0)), mode='edge')
+
+    def _encode_frame(self, timestamp: float, frame: np.ndarray, outputs, timings):
+        # 記錄原始尺寸（灰階為 2 維），讀取時據此還原通道維度
+        shape = list(frame.shape)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        padded = self._pad(frame)
+        local = self._frame_index - self._chunk_first_frame
+        key = f"f{local:05d}"
+
+        is_keyframe = (local == 0 or self._prev_padded is None or
+                       self._prev_padded.shape != padded.shape or
+                       self._since_keyframe >= self.keyframe_interval)
+        if is_keyframe:
+            self._chunk_entries[key + '_key'] = frame
+            self._chunk_bytes += frame.nbytes
+            self._since_keyframe = 0
+            self.stats['keyframes'] += 1
+        else:
+            # 以區塊比較與上一張的差異，只存有變化的區塊
+            t = self.tile_size
+            ph, pw, c = padded.shape
+            changed = np.any(padded != self._prev_padded, axis=2)
+            changed = changed.reshape(ph // t, t, pw // t, t).any(axis=(1, 3))
+            tile_rows, tile_cols = np.nonzero(changed)
+            tiles = padded.reshape(ph // t, t, pw // t, t, c).transpose(0, 2, 1, 3, 4)[tile_rows, tile_cols]
+            self._chunk_entries[key + '_idx'] = np.column_stack((tile_rows, tile_cols)).astype(np.int16)
+            self._chunk_entries[key + '_tiles'] = tiles
+            self._chunk_bytes += tiles.nbytes
+            self._since_keyframe += 1
+
+        self._chunk_meta.append(json.dumps({
+            'frame': self._frame_index,
+            'timestamp': timestamp,
+            'shape': shape,
+            'keyframe': is_keyframe,
+            'outputs': _to_jsonable(outputs or {}),
+            'timings': _to_jsonable(timings or {})
+        }, ensure_ascii=False))
+
+        self._prev_padded = padded
+        self._frame_index += 1
+        self.stats['recorded'] += 1
+
+        if len(self._chunk_meta) >= self.chunk_size or self._chunk_bytes >= self.max_chunk_bytes:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        """寫出目前的分塊並更新索引"""
+        if not self._chunk_meta:
+            return
+        name = f"chunk_{len(self._chunks):06d}.npz"
+        path = os.path.join(self.output_dir, name)
+        np.savez_compressed(path, meta=np.array(self._chunk_meta), **self._chunk_entries)
+
+        first_meta = json.loads(self._chunk_meta[0])
+        self._chunks.append({
+            'file': name,
+            'first_frame': self._chunk_first_frame,
+            'count': len(self._chunk_meta),
+            'first_timestamp': first_meta['timestamp']
+        })
+        self.stats['chunks'] += 1
+        self.stats['bytes_written'] += os.path.getsize(path)
+        self._write_index()
+
+        self._chunk_first_frame = self._frame_index
+        self._chunk_entries = {}
+        self._chunk_meta = []
+        self._chunk_bytes = 0
+        self._prev_padded = None  # 下一塊以關鍵幀開頭
+
+    def _write_index(self):
+        index_path = os.path.join(self.output_dir, 'index.json')
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': SESSION_VERSION,
+                'tile_size': self.tile_size,
+                'frame_count': self._frame_index,
+                'chunks': self._chunks
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, index_path)
+
+
+class SessionReader:
+    """讀取錄製的工作階段（可依畫面編號跳轉，循序讀取時只套用差異區塊）"""
+
+    def __init__(self, session_dir: str):
+        self.session_dir = session_dir
+        with open(os.path.join(session_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != SESSION_VERSION:
+            raise ValueError(f"不支援的錄製版本: {index.get('version')}")
+        self.tile_size = index['tile_size']
+        self.chunks = index['chunks']
+        self.frame_count = sum(chunk['count'] for chunk in self.chunks)
+
+        self._chunk_no = None
+        self._data = None
+        self._metas: List[Dict] = []
+        self._canvas = None
+        self._canvas_local = -1
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __iter__(self):
+        for index in range(self.frame_count):
+            yield self.read(index)
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+        self._data = None
+        self._chunk_no = None
+
+    def read(self, index: int) -> Tuple[np.ndarray, Dict]:
+        """讀取第 index 張畫面與其處理結果"""
+        if not 0 <= index < self.frame_count:
+            raise IndexError(f"畫面編號超出範圍: {index}")
+        chunk_no = next(i for i, chunk in enumerate(self.chunks)
+                        if chunk['first_frame'] <= index < chunk['first_frame'] + chunk['count'])
+        if chunk_no != self._chunk_no:
+            self._open_chunk(chunk_no)
+        local = index - self.chunks[chunk_no]['first_frame']
+
+        # 循序讀取時從目前畫面往前套用，否則從最近的關鍵幀開始
+        if not (self._canvas is not None and self._canvas_local <= local):
+            self._canvas_local = max(i for i in range(local + 1) if self._metas[i]['keyframe']) - 1
+        while self._canvas_local < local:
+            self._apply(self._canvas_local + 1)
+
+        meta = self._metas[local]
+        h, w = meta['shape'][:2]
+        frame = self._canvas[:h, :w].copy()
+        return (frame[:, :, 0] if len(meta['shape']) == 2 else frame), meta
+
+    def _open_chunk(self, chunk_no: int):
+        self.close()
+        self._data = np.load(os.path.join(self.session_dir, self.chunks[chunk_no]['file']))
+        self._metas = [json.loads(str(raw)) for raw in self._data['meta']]
+        self._chunk_no = chunk_no
+        self._canvas = None
+        self._canvas_local = -1
+
+    def _apply(self, local: int):
+        """將第 local 張畫面套用到畫布（關鍵幀取代、差異幀覆寫變化區塊）"""
+        t = self.tile_size
+        meta = self._metas[local]
+        key = f"f{local:05d}"
+        if meta['keyframe']:
+            frame = self._data[key + '_key']
+            if frame.ndim == 2:
+                frame = frame[:, :, None]
+            h, w = frame.shape[:2]
+            self._canvas = np.pad(frame, ((0, (-h) % t), (0, (-w) % t), (0, 0)), mode='edge')
+        else:
+            for (row, col), tile in zip(self._data[key + '_idx'], self._data[key + '_tiles']):
+                self._canvas[row * t:(row + 1) * t, col * t:(col + 1) * t] = tile
+        self._canvas_local = local
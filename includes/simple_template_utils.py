@@ -4,99 +4,227 @@ import cv2
 import numpy as np
 import os
 import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 from typing import List, Dict
 from includes.log_utils import get_logger
+from includes.match_utils import MatchUtils
+from includes.fft_match_utils import FFTBatchMatcher
+from includes.template_bundle_utils import TemplateBundle
+from includes.detector_registry import get_detector_registry
+from includes.detection_utils import Detections
+from includes.monster_tracking_utils import MonsterTracker
 
 
 class SimpleMonsterDetector:
     """🚀 極簡化怪物檢測器 - 純模板匹配，無額外處理"""
     
+    # 只讀取這些設定區段（共用註冊表以此比對設定）
+    config_sections = ('monster_detection',)
+    
     def __init__(self, template_dir="templates/monsters", config=None):
-        """初始化極簡檢測器"""
+        """初始化極簡檢測器（template_dir 為 None 時不載入模板，由呼叫者自行設定）"""
         self.template_dir = template_dir
+        self.config = config or {}
         self.templates = []
         self.confidence_threshold = 0.6
         self.max_detections = 20
         self.scale_factor = 0.7
+        self.template_scales = [1.0]  # 模板相對尺度（多尺度匹配用，1.0 = 只用 scale_factor）
         self.max_processing_time = 1.0
+        self.template_bundle_enabled = True  # 使用預編譯模板包加速啟動
+        self.template_bundle = TemplateBundle()
+        self.template_dedup_enabled = False  # 載入時合併幾乎相同的模板（例如相鄰動畫幀）
+        self.template_dedup_threshold = 0.95  # 相似度超過此值視為重複
+        self.nms_iou_threshold = 0.3  # NMS 重疊閾值
+        self.matching_workers = 1  # 模板匹配執行緒數（1 = 單執行緒）
+        self._match_executor = None
+        self.matching_engine = 'opencv'  # 匹配引擎：opencv（逐模板）/ fft（同尺寸模板頻域批次）
+        self.fft_matcher = FFTBatchMatcher()
         
-        # 從設定檔載入參數
-        if config:
-            monster_config = config.get('monster_detection', {})
-            self.confidence_threshold = monster_config.get('confidence_threshold', 0.6)
-            self.max_detections = monster_config.get('max_detections_per_frame', 20)
-            self.scale_factor = monster_config.get('scale_factor', 0.7)
-            self.max_processing_time = monster_config.get('max_processing_time', 1.0)
+        # 🎯 ROI 模式：只在角色周圍區域檢測，定期全畫面掃描
+        self.roi_enabled = False
+        self.roi_size = (0.6, 0.6)  # ROI 佔畫面寬高比例
+        self.roi_full_frame_interval = 1.0  # 全畫面掃描間隔（秒）
+        
+        # 🎯 時序追蹤：軌跡在預測位置附近重新匹配，定期或遺失時才全畫面檢測
+        self.tracking_enabled = False
+        self.tracking_search_margin = 0.5  # 搜索窗口外擴比例（相對於怪物框大小）
+        self.tracking_full_detect_interval = 0.5  # 軌跡模式全畫面檢測間隔（秒）
+        self.tracking_max_misses = 2  # 軌跡連續遺失幾次後移除
+        
+        # 🎯 粗到精匹配：低解析度找候選，再以原始解析度在候選附近驗證
+        self.coarse_to_fine_enabled = False
+        self.coarse_scale = 0.25  # 粗匹配縮放比例
+        self.coarse_confidence_threshold = 0.45  # 粗匹配放寬的閾值
+        self.fine_search_margin = 4  # 精匹配窗口額外外擴（原始像素）
+        
+        # 🎯 運動遮罩：只在畫面有變化的區域匹配，定期全畫面刷新（靜止的怪物）
+        self.motion_gating_enabled = False
+        self.motion_scale = 0.25  # 幀差計算用的縮放比例
+        self.motion_threshold = 15  # 灰階差異閾值
+        self.motion_dilate_size = 5  # 遮罩膨脹大小（縮小後像素）
+        self.motion_max_area_ratio = 0.5  # 運動面積超過此比例時直接全畫面檢測
+        self.motion_full_frame_interval = 2.0  # 全畫面刷新間隔（秒）
+        
+        # 🔒 逐幀狀態（ROI/運動遮罩計時、上一幀、軌跡）依呼叫執行緒分開保存，
+        # 共用同一實例的主循環、GUI、戰鬥執行緒不會互相干擾
+        self._consumer_state = threading.local()
+        self._template_generation = 0
+        
+        # 🚀 預縮放模板緩存：{絕對縮放比例: [縮放後模板, ...]}，與 self.templates 順序一致
+        self._scaled_template_cache = {}
+        self._template_cache_lock = threading.Lock()
+        self._template_names = None  # 檢測結果共用的模板名稱列表
         
         self.logger = get_logger("SimpleTemplateUtils")
+        
+        # 從設定檔載入參數
+        self._apply_config(config)
         self.logger.info(f"設定檔參數: 閾值={self.confidence_threshold}, 最大檢測={self.max_detections}, 縮放={self.scale_factor}, 超時={self.max_processing_time}秒")
         
         self.logger.info(f"初始化極簡檢測器，模板目錄: {template_dir}")
-        self._load_templates()
+        if template_dir:
+            self._load_templates()
         self.logger.info(f"極簡檢測器就緒: {len(self.templates)} 個模板")
     
-    def detect_monsters(self, game_frame: np.ndarray, frame_history=None) -> List[Dict]:
-        """🚀 極簡化檢測器 - 純模板匹配，加效能優化"""
+    def _apply_config(self, config):
+        """從設定檔讀取檢測參數"""
+        if not config:
+            return
+        
+        monster_config = config.get('monster_detection', {})
+        self.confidence_threshold = monster_config.get('confidence_threshold', 0.6)
+        self.max_detections = monster_config.get('max_detections_per_frame', 20)
+        self.scale_factor = monster_config.get('scale_factor', 0.7)
+        self.template_scales = list(monster_config.get('template_scales', [1.0])) or [1.0]
+        self.max_processing_time = monster_config.get('max_processing_time', 1.0)
+        self.template_bundle_enabled = monster_config.get('template_bundle_enabled', True)
+        self.template_bundle.cache_dir = monster_config.get('template_bundle_dir', 'data/cache/template_bundles')
+        self.template_dedup_enabled = monster_config.get('template_dedup_enabled', False)
+        self.template_dedup_threshold = monster_config.get('template_dedup_threshold', 0.95)
+        self.nms_iou_threshold = monster_config.get('nms_iou_threshold', 0.3)
+        self.matching_workers = max(1, int(monster_config.get('matching_workers', 1)))
+        self.matching_engine = str(monster_config.get('matching_engine', 'opencv')).lower()
+        self.fft_matcher.batch_size = max(1, int(monster_config.get('fft_batch_size', 4)))
+        self.fft_matcher.max_cache_bytes = int(max(1.0, monster_config.get('fft_cache_mb', 64.0)) * 1024 * 1024)
+        self.roi_enabled = monster_config.get('roi_enabled', False)
+        self.roi_size = tuple(monster_config.get('roi_size', [0.6, 0.6]))
+        self.roi_full_frame_interval = monster_config.get('roi_full_frame_interval', 1.0)
+        self.tracking_enabled = monster_config.get('tracking_enabled', False)
+        self.tracking_search_margin = monster_config.get('tracking_search_margin', 0.5)
+        self.tracking_full_detect_interval = monster_config.get('tracking_full_detect_interval', 0.5)
+        self.tracking_max_misses = monster_config.get('tracking_max_misses', 2)
+        self.coarse_to_fine_enabled = monster_config.get('coarse_to_fine_enabled', False)
+        self.coarse_scale = monster_config.get('coarse_scale', 0.25)
+        self.coarse_confidence_threshold = monster_config.get('coarse_confidence_threshold', 0.45)
+        self.fine_search_margin = monster_config.get('fine_search_margin', 4)
+        self.motion_gating_enabled = monster_config.get('motion_gating_enabled', False)
+        self.motion_scale = monster_config.get('motion_scale', 0.25)
+        self.motion_threshold = monster_config.get('motion_threshold', 15)
+        self.motion_dilate_size = monster_config.get('motion_dilate_size', 5)
+        self.motion_max_area_ratio = monster_config.get('motion_max_area_ratio', 0.5)
+        self.motion_full_frame_interval = monster_config.get('motion_full_frame_interval', 2.0)
+    
+    def update_config(self, config):
+        """更新檢測參數 - 縮放設定變更時重建預縮放模板"""
+        old_scales = self._get_match_scales()
+        old_workers = self.matching_workers
+        self.config = config or {}
+        self._apply_config(config)
+        
+        if self.matching_workers != old_workers:
+            self._shutdown_executor()
+        
+        if self._get_match_scales() != old_scales:
+            self._invalidate_template_cache()
+            self._prepare_scaled_templates()
+            self.logger.info(f"縮放設定已變更: 縮放={self.scale_factor}, 模板尺度={self.template_scales}")
+    
+    # === 預縮放模板緩存 ===
+    
+    def _get_match_scales(self):
+        """取得實際匹配使用的模板絕對縮放比例"""
+        return [round(self.scale_factor * s, 4) for s in self.template_scales]
+    
+    def _get_scaled_templates(self, scale):
+        """取得指定縮放比例的模板列表（首次使用時建立並緩存）"""
+        scaled = self._scaled_template_cache.get(scale)
+        if scaled is not None and len(scaled) == len(self.templates):
+            return scaled
+        
+        with self._template_cache_lock:
+            scaled = self._scaled_template_cache.get(scale)
+            if scaled is None or len(scaled) != len(self.templates):
+                scaled = [self._resize_template(t['image'], scale) for t in self.templates]
+                self._scaled_template_cache[scale] = scaled
+            return scaled
+    
+    def _resize_template(self, template, scale):
+        """縮放單一模板（確保尺寸至少 1 像素）"""
+        if scale == 1.0:
+            return template
+        h, w = template.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        return cv2.resize(template, size)
+    
+    def _prepare_scaled_templates(self):
+        """預先建立目前設定所需的所有縮放模板，避免首幀延遲"""
+        for scale in self._get_match_scales():
+            self._get_scaled_templates(scale)
+    
+    def _invalidate_template_cache(self, templates=None):
+        """清除預縮放模板緩存（模板集合變更時呼叫）
+        
+        Args:
+            templates: 新的模板列表（提供時在同一個鎖內替換，與緩存清除同時生效）
+        """
+        with self._template_cache_lock:
+            if templates is not None:
+                self.templates = templates
+            self._scaled_template_cache = {}
+            self._template_names = None
+            # 模板索引已改變，各執行緒的舊軌跡與沿用的檢測結果不再有效
+            self._template_generation += 1
+        self.fft_matcher.clear_cache()
+    
+    def _get_state(self) -> '_DetectionState':
+        """取得目前執行緒的逐幀檢測狀態（模板變更後重新建立）"""
+        state = getattr(self._consumer_state, 'state', None)
+        if state is None or state.template_generation != self._template_generation:
+            state = _DetectionState(self._template_generation)
+            self._consumer_state.state = state
+        state.monster_tracker.full_detect_interval = self.tracking_full_detect_interval
+        state.monster_tracker.max_misses = self.tracking_max_misses
+        return state
+    
+    def detect_monsters(self, game_frame: np.ndarray, frame_history=None, focus_point=None) -> Detections:
+        """🚀 極簡化檢測器 - 純模板匹配，加效能優化
+        
+        Args:
+            game_frame: 遊戲畫面
+            frame_history: 歷史幀（運動遮罩模式用於幀差，可為彩色或灰階）
+            focus_point: 角色在畫面上的相對座標 (0-1)，ROI 模式下只檢測其周圍區域
+        
+        Returns:
+            Detections：欄位式結果，可像列表一樣迭代出舊格式字典
+        """
         if game_frame is None or not self.templates:
-            return []
+            return Detections.empty()
         
         try:
             start_time = time.time()
             
             # 轉灰階
             gray = cv2.cvtColor(game_frame, cv2.COLOR_BGR2GRAY) if len(game_frame.shape) == 3 else game_frame
+            state = self._get_state()
             
-            # 🚀 效能優化：縮小圖像進行快速檢測（從設定檔讀取）
-            small_gray = cv2.resize(gray, None, fx=self.scale_factor, fy=self.scale_factor)
-            
-            results = []
-            
-            # 直接模板匹配 - 使用所有模板但加入早停機制
-            for i, template_info in enumerate(self.templates):
-                template = template_info['image']
-                
-                # 🚀 效能優化：同樣縮小模板（從設定檔讀取）
-                small_template = cv2.resize(template, None, fx=self.scale_factor, fy=self.scale_factor)
-                
-                # 🚀 效能優化：超時檢查（從設定檔讀取）
-                if time.time() - start_time > self.max_processing_time:
-                    self.logger.warning(f"⚠️ 檢測超時，已處理 {i+1}/{len(self.templates)} 個模板")
-                    break
-                
-                # 單一尺度匹配（使用縮小的圖像）
-                result = cv2.matchTemplate(small_gray, small_template, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                
-                if max_val >= self.confidence_threshold:
-                    # 🚀 將座標還原到原始尺寸
-                    x, y = max_loc
-                    h, w = small_template.shape
-                    
-                    # 還原到原始座標（從設定檔讀取縮放係數）
-                    orig_x = int(x / self.scale_factor)
-                    orig_y = int(y / self.scale_factor)
-                    orig_w = int(w / self.scale_factor)
-                    orig_h = int(h / self.scale_factor)
-                    
-                    results.append({
-                        'bbox': (orig_x, orig_y, orig_w, orig_h),
-                        'confidence': float(max_val),
-                        'template_name': template_info['name'],
-                        'name': template_info['name'],
-                        'position': (orig_x + orig_w//2, orig_y + orig_h//2),
-                        'x': orig_x, 'y': orig_y, 'width': orig_w, 'height': orig_h,
-                        'detection_level': 'fast'
-                    })
-                
-                # 🚀 早停機制：找到足夠的結果就停止
-                if len(results) >= self.max_detections:
-                    self.logger.warning(f"🎯 已找到 {len(results)} 個目標，提前停止檢測")
-                    break
-            
-            # 簡單去重：只保留信心度最高的前5個
-            if len(results) > self.max_detections:
-                results.sort(key=lambda x: x['confidence'], reverse=True)
-                results = results[:self.max_detections]
+            if self.tracking_enabled:
+                # 🎯 時序追蹤：優先在軌跡預測位置附近重新匹配
+                results = self._detect_with_tracking(state, gray, focus_point, frame_history, start_time)
+            else:
+                boxes, scores, template_ids = self._detect_full(state, gray, focus_point, frame_history, start_time)
+                results = self._build_results(boxes, scores, template_ids)
             
             detection_time = time.time() - start_time
             if results:
@@ -106,7 +234,570 @@ class SimpleMonsterDetector:
             
         except Exception as e:
             self.logger.error(f"❌ 簡單檢測失敗: {e}")
+            return Detections.empty()
+    
+    def detect_batch(self, frames, processes=1) -> Dict:
+        """🚀 批次檢測多幀（離線回放/調參用），以欄位式陣列回傳結果
+        
+        每幀獨立做全畫面檢測（不使用 ROI、運動遮罩與追蹤狀態），
+        灰階/縮放緩衝區在幀之間重複使用，不建立逐筆結果字典。
+        
+        Args:
+            frames: 幀序列（list 或 (N, H, W[, C]) 陣列）
+            processes: 子行程數（>1 時將幀分段交給行程池處理）
+        
+        Returns:
+            {'frame_indices': (N,), 'boxes': (N, 4) 的 (x, y, w, h), 'scores': (N,),
+             'template_ids': (N,), 'template_names': 模板名稱列表（以 template_ids 索引）}
+        """
+        frames = list(frames)
+        if not self.templates or not frames:
+            return self._make_batch_result([])
+        
+        if processes > 1 and len(frames) > 1:
+            return self._detect_batch_parallel(frames, processes)
+        
+        start_time = time.time()
+        gray_buffer = None
+        small_buffer = None
+        parts = []
+        for frame_index, frame in enumerate(frames):
+            if frame is None:
+                continue
+            frame_start = time.time()
+            
+            if frame.ndim == 3:
+                if gray_buffer is None or gray_buffer.shape != frame.shape[:2]:
+                    gray_buffer = np.empty(frame.shape[:2], np.uint8)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_buffer)
+                gray = gray_buffer
+            else:
+                gray = frame
+            
+            if self.coarse_to_fine_enabled:
+                boxes, scores, template_ids = self._match_coarse_to_fine(gray, frame_start)
+            else:
+                frame_h, frame_w = gray.shape[:2]
+                small_size = (max(1, int(round(frame_w * self.scale_factor))),
+                              max(1, int(round(frame_h * self.scale_factor))))
+                if small_buffer is None or small_buffer.shape != (small_size[1], small_size[0]):
+                    small_buffer = np.empty((small_size[1], small_size[0]), np.uint8)
+                cv2.resize(gray, small_size, dst=small_buffer)
+                boxes, scores, template_ids = self._match_templates(small_buffer, frame_start)
+                boxes = boxes / self.scale_factor
+            
+            keep = MatchUtils.non_max_suppression(boxes, scores, self.nms_iou_threshold, self.max_detections)
+            if keep.size:
+                parts.append((np.full(keep.size, frame_index, np.int32),
+                              boxes[keep].astype(np.int32), scores[keep], template_ids[keep]))
+        
+        result = self._make_batch_result(parts)
+        self.logger.debug(f"🎯 批次檢測 {len(frames)} 幀，共 {len(result['scores'])} 個怪物 (耗時: {time.time() - start_time:.3f}秒)")
+        return result
+    
+    def _detect_batch_parallel(self, frames, processes):
+        """以行程池分段批次檢測，子行程使用本實例目前的設定與模板"""
+        chunk_size = (len(frames) + processes - 1) // processes
+        chunks = [frames[i:i + chunk_size] for i in range(0, len(frames), chunk_size)]
+        templates = [dict(t, image=np.ascontiguousarray(t['image'])) for t in self.templates]
+        
+        with ProcessPoolExecutor(max_workers=min(processes, len(chunks)),
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.config, templates)) as pool:
+            chunk_results = list(pool.map(_run_batch_worker, chunks))
+        
+        parts = []
+        for chunk_index, chunk_result in enumerate(chunk_results):
+            parts.append((chunk_result['frame_indices'] + chunk_index * chunk_size,
+                          chunk_result['boxes'], chunk_result['scores'], chunk_result['template_ids']))
+        return self._make_batch_result(parts)
+    
+    def _make_batch_result(self, parts):
+        """合併 (frame_indices, boxes, scores, template_ids) 片段為欄位式結果"""
+        if parts:
+            frame_indices, boxes, scores, template_ids = (np.concatenate(column) for column in zip(*parts))
+        else:
+            frame_indices = np.empty(0, np.int32)
+            boxes = np.empty((0, 4), np.int32)
+            scores = np.empty(0, np.float32)
+            template_ids = np.empty(0, np.int32)
+        return {
+            'frame_indices': frame_indices.astype(np.int32),
+            'boxes': boxes.astype(np.int32),
+            'scores': scores.astype(np.float32),
+            'template_ids': template_ids.astype(np.int32),
+            'template_names': [t['name'] for t in self.templates]
+        }
+    
+    def _detect_full(self, state, gray, focus_point, frame_history, start_time):
+        """全域檢測：在搜索區域內匹配所有模板並以 NMS 合併"""
+        # 🎯 決定搜索區域（全畫面、角色周圍 ROI、運動區域）
+        regions, base_regions = self._plan_search_regions(state, gray, focus_point, frame_history, start_time)
+        
+        # 🎯 多峰值匹配：每個區域、每個模板取出所有超過閾值的局部最大值
+        boxes, scores, template_ids = self._detect_in_regions(gray, regions, start_time)
+        
+        if base_regions is not None:
+            # 🎯 運動遮罩：沒有重新匹配的靜止區域沿用上次的結果
+            boxes, scores, template_ids = self._merge_static_hits(state, boxes, scores, template_ids, regions, base_regions)
+        
+        # 🎯 跨模板 NMS 合併重疊框，數量上限為 max_detections
+        keep = MatchUtils.non_max_suppression(boxes, scores, self.nms_iou_threshold, self.max_detections)
+        boxes, scores, template_ids = boxes[keep], scores[keep], template_ids[keep]
+        if self.motion_gating_enabled:
+            state.motion_last_hits = (boxes, scores, template_ids)
+        return boxes, scores, template_ids
+    
+    def _merge_static_hits(self, state, boxes, scores, template_ids, regions, base_regions):
+        """加入上次檢測結果中中心點位於搜索範圍內、但不在本次重新匹配區域內的命中
+        
+        Args:
+            regions: 本次重新匹配的運動區域
+            base_regions: 運動遮罩前的搜索範圍（全畫面或 ROI）
+        """
+        if state.motion_last_hits is None:
+            return boxes, scores, template_ids
+        last_boxes, last_scores, last_ids = state.motion_last_hits
+        if last_scores.size == 0:
+            return boxes, scores, template_ids
+        
+        centers_x = last_boxes[:, 0] + last_boxes[:, 2] / 2.0
+        centers_y = last_boxes[:, 1] + last_boxes[:, 3] / 2.0
+        
+        def inside(rects):
+            mask = np.zeros(centers_x.shape[0], dtype=bool)
+            for (x, y, w, h) in rects:
+                mask |= (centers_x >= x) & (centers_x < x + w) & (centers_y >= y) & (centers_y < y + h)
+            return mask
+        
+        keep = inside(base_regions) & ~inside(regions)
+        if not keep.any():
+            return boxes, scores, template_ids
+        return (np.concatenate((boxes, last_boxes[keep].astype(boxes.dtype))),
+                np.concatenate((scores, last_scores[keep].astype(scores.dtype))),
+                np.concatenate((template_ids, last_ids[keep].astype(template_ids.dtype))))
+    
+    def _detect_with_tracking(self, state, gray, focus_point, frame_history, now):
+        """🎯 追蹤模式檢測：軌跡局部重新匹配，必要時才全域檢測"""
+        tracker = state.monster_tracker
+        
+        if tracker.needs_full_detection(now):
+            boxes, scores, template_ids = self._detect_full(state, gray, focus_point, frame_history, now)
+            tracker.associate(boxes, scores, template_ids, now)
+        else:
+            for track in tracker.tracks:
+                match = self._rematch_track(gray, track, now)
+                if match:
+                    bbox, score = match
+                    tracker.update_track(track, bbox, score, now)
+                else:
+                    tracker.mark_missed(track)
+            tracker.prune()
+        
+        visible = tracker.visible_tracks(now)
+        if not visible:
+            return Detections.empty(self._get_template_names())
+        
+        boxes = np.array([t.bbox for t in visible], dtype=np.float32).astype(np.int32)
+        scores = np.array([t.confidence for t in visible], dtype=np.float32)
+        template_ids = np.array([t.template_id for t in visible], dtype=np.int32)
+        track_ids = [t.track_id for t in visible]
+        return self._build_results(boxes, scores, template_ids, track_ids)
+    
+    def _rematch_track(self, gray, track, now):
+        """在軌跡預測位置附近的小窗口內重新匹配其模板
+        
+        Returns:
+            ((x, y, w, h), score) 或 None（未找到）
+        """
+        if track.template_id >= len(self.templates):
+            return None
+        
+        frame_h, frame_w = gray.shape[:2]
+        x, y, w, h = track.predicted_bbox(now)
+        margin_x = max(8.0, w * self.tracking_search_margin)
+        margin_y = max(8.0, h * self.tracking_search_margin)
+        x1 = int(max(0, x - margin_x))
+        y1 = int(max(0, y - margin_y))
+        x2 = int(min(frame_w, x + w + margin_x))
+        y2 = int(min(frame_h, y + h + margin_y))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        
+        # 依軌跡框大小選出最接近的模板尺度
+        original_w = self.templates[track.template_id]['size'][1]
+        track_scale = self.scale_factor * w / max(1, original_w)
+        scale = min(self._get_match_scales(), key=lambda s: abs(s - track_scale))
+        template = self._get_scaled_templates(scale)[track.template_id]
+        
+        window = cv2.resize(gray[y1:y2, x1:x2], None, fx=self.scale_factor, fy=self.scale_factor)
+        th, tw = template.shape[:2]
+        if th > window.shape[0] or tw > window.shape[1]:
+            return None
+        
+        result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.confidence_threshold:
+            return None
+        
+        bbox = (x1 + max_loc[0] / self.scale_factor, y1 + max_loc[1] / self.scale_factor,
+                tw / self.scale_factor, th / self.scale_factor)
+        return bbox, float(max_val)
+    
+    def _plan_search_regions(self, state, gray, focus_point, frame_history, now):
+        """決定本次檢測的搜索區域列表 [(x, y, w, h), ...]（原始座標）
+        
+        Returns:
+            (regions, base_regions)：base_regions 只在運動遮罩縮小了搜索範圍時提供，
+            為縮小前的範圍（其中未重新匹配的部分沿用上次結果），否則為 None
+        """
+        frame_h, frame_w = gray.shape[:2]
+        regions = [(0, 0, frame_w, frame_h)]
+        
+        if self.roi_enabled and focus_point is not None:
+            # 定期全畫面掃描，避免遺漏 ROI 外的怪物
+            if now - state.last_full_frame_time >= self.roi_full_frame_interval:
+                state.last_full_frame_time = now
+                return regions, None
+            
+            roi = self._get_roi_around(focus_point, frame_w, frame_h)
+            if roi:
+                regions = [roi]
+        
+        if self.motion_gating_enabled:
+            motion_regions = self._get_motion_regions(state, gray, frame_history)
+            
+            # 定期全區域刷新，讓靜止的怪物也能被檢測到
+            if now - state.last_motion_refresh_time >= self.motion_full_frame_interval:
+                state.last_motion_refresh_time = now
+            elif motion_regions is not None:
+                base_regions = regions
+                regions = [r for r in (MatchUtils.intersect_rects(m, base) for m in motion_regions for base in regions) if r]
+                return regions, base_regions
+        
+        return regions, None
+    
+    def _get_motion_regions(self, state, gray, frame_history):
+        """🎯 由幀差建立運動遮罩，回傳運動區域列表（原始座標）
+        
+        Returns:
+            運動區域列表；無法判斷（沒有參考幀或運動範圍過大）時回傳 None
+        """
+        small = cv2.resize(gray, None, fx=self.motion_scale, fy=self.motion_scale, interpolation=cv2.INTER_AREA)
+        reference = self._select_motion_reference(state, small, frame_history)
+        state.motion_prev_small = small
+        if reference is None:
+            return None
+        
+        diff = cv2.absdiff(small, reference)
+        _, mask = cv2.threshold(diff, self.motion_threshold, 255, cv2.THRESH_BINARY)
+        kernel = np.ones((self.motion_dilate_size, self.motion_dilate_size), np.uint8)
+        mask = cv2.dilate(mask, kernel)
+        
+        if cv2.countNonZero(mask) > mask.size * self.motion_max_area_ratio:
+            return None
+        
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        if count <= 1:
             return []
+        
+        # 還原到原始座標，並外擴一個模板大小，確保移動中的怪物完整落在區域內
+        frame_h, frame_w = gray.shape[:2]
+        pad_w = max(t['size'][1] for t in self.templates)
+        pad_h = max(t['size'][0] for t in self.templates)
+        rects = []
+        for x, y, w, h in stats[1:, :4].tolist():
+            x1 = max(0, int(x / self.motion_scale) - pad_w)
+            y1 = max(0, int(y / self.motion_scale) - pad_h)
+            x2 = min(frame_w, int((x + w) / self.motion_scale) + pad_w)
+            y2 = min(frame_h, int((y + h) / self.motion_scale) + pad_h)
+            rects.append((x1, y1, x2 - x1, y2 - y1))
+        
+        return MatchUtils.merge_overlapping_rects(rects)
+    
+    def _select_motion_reference(self, state, small, frame_history):
+        """選擇幀差參考幀：歷史幀中最新且與目前畫面不同的一幀，沒有時使用上一次的畫面"""
+        if frame_history:
+            for frame in reversed(frame_history):
+                if frame is None:
+                    continue
+                ref_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if len(frame.shape) == 3 else frame
+                ref_small = cv2.resize(ref_gray, (small.shape[1], small.shape[0]), interpolation=cv2.INTER_AREA)
+                # 歷史幀的最後一幀通常就是目前畫面，跳過完全相同的幀
+                if not np.array_equal(ref_small, small):
+                    return ref_small
+        
+        prev = state.motion_prev_small
+        if prev is not None and prev.shape == small.shape:
+            return prev
+        return None
+    
+    def _get_roi_around(self, focus_point, frame_w, frame_h):
+        """計算角色周圍的 ROI（確保至少能容納最大的模板）"""
+        try:
+            center_x = float(focus_point[0]) * frame_w
+            center_y = float(focus_point[1]) * frame_h
+        except (TypeError, ValueError, IndexError):
+            return None
+        
+        max_template_h = max(t['size'][0] for t in self.templates)
+        max_template_w = max(t['size'][1] for t in self.templates)
+        roi_w = max(int(frame_w * self.roi_size[0]), max_template_w * 2)
+        roi_h = max(int(frame_h * self.roi_size[1]), max_template_h * 2)
+        
+        x1 = int(max(0, min(frame_w - roi_w, center_x - roi_w / 2)))
+        y1 = int(max(0, min(frame_h - roi_h, center_y - roi_h / 2)))
+        x2 = min(frame_w, x1 + roi_w)
+        y2 = min(frame_h, y1 + roi_h)
+        return (x1, y1, x2 - x1, y2 - y1)
+    
+    def _detect_in_regions(self, gray, regions, start_time):
+        """在指定區域內匹配所有模板，回傳原始座標系中的候選框"""
+        all_boxes, all_scores, all_ids = [], [], []
+        for (x, y, w, h) in regions:
+            region_gray = gray[y:y + h, x:x + w]
+            
+            if self.coarse_to_fine_enabled:
+                boxes, scores, template_ids = self._match_coarse_to_fine(region_gray, start_time)
+            else:
+                # 🚀 效能優化：縮小圖像進行快速檢測（從設定檔讀取）
+                small_gray = cv2.resize(region_gray, None, fx=self.scale_factor, fy=self.scale_factor)
+                boxes, scores, template_ids = self._match_templates(small_gray, start_time)
+                # 還原到原始座標（從設定檔讀取縮放係數）
+                boxes = boxes / self.scale_factor
+            if scores.size == 0:
+                continue
+            
+            # 加上區域偏移
+            boxes[:, 0] += x
+            boxes[:, 1] += y
+            all_boxes.append(boxes.astype(np.int32))
+            all_scores.append(scores)
+            all_ids.append(template_ids)
+        
+        if not all_scores:
+            return np.empty((0, 4), np.int32), np.empty(0, np.float32), np.empty(0, np.int32)
+        
+        return np.concatenate(all_boxes), np.concatenate(all_scores), np.concatenate(all_ids)
+    
+    def _match_coarse_to_fine(self, region_gray, start_time):
+        """🎯 粗到精匹配：低解析度放寬閾值取候選，再以原始解析度在候選附近驗證
+        
+        Returns:
+            (boxes, scores, template_ids)：boxes 為區域內原始座標
+        """
+        coarse_gray = cv2.resize(region_gray, None, fx=self.coarse_scale, fy=self.coarse_scale,
+                                 interpolation=cv2.INTER_AREA)
+        coarse_scales = [round(self.coarse_scale * s, 4) for s in self.template_scales]
+        boxes, scores, template_ids = self._match_templates(
+            coarse_gray, start_time, scales=coarse_scales, threshold=self.coarse_confidence_threshold
+        )
+        if scores.size == 0:
+            return boxes, scores, template_ids
+        
+        # 同一位置只保留最佳候選，減少驗證次數
+        boxes = boxes / self.coarse_scale
+        keep = MatchUtils.non_max_suppression(boxes, scores, self.nms_iou_threshold, self.max_detections * 2)
+        
+        fine_boxes, fine_scores, fine_ids = [], [], []
+        for i in keep:
+            if time.time() - start_time > self.max_processing_time:
+                self.logger.warning(f"⚠️ 檢測超時，已驗證 {len(fine_scores)}/{len(keep)} 個候選")
+                break
+            match = self._verify_candidate(region_gray, boxes[i], int(template_ids[i]))
+            if match:
+                bbox, score = match
+                fine_boxes.append(bbox)
+                fine_scores.append(score)
+                fine_ids.append(template_ids[i])
+        
+        if not fine_scores:
+            return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int32)
+        return (np.array(fine_boxes, dtype=np.float32),
+                np.array(fine_scores, dtype=np.float32),
+                np.array(fine_ids, dtype=np.int32))
+    
+    def _verify_candidate(self, region_gray, coarse_box, template_index):
+        """以原始解析度模板在粗匹配候選附近的小窗口內驗證
+        
+        Returns:
+            ((x, y, w, h), score) 或 None（未通過驗證）
+        """
+        x, y, w, h = (float(v) for v in coarse_box)
+        original_w = self.templates[template_index]['size'][1]
+        template_scale = min(self.template_scales, key=lambda s: abs(s - w / max(1, original_w)))
+        template = self._get_scaled_templates(round(template_scale, 4))[template_index]
+        th, tw = template.shape[:2]
+        
+        # 窗口外擴：一個粗匹配像素的量化誤差 + 額外邊距
+        margin = int(np.ceil(1.0 / self.coarse_scale)) + self.fine_search_margin
+        region_h, region_w = region_gray.shape[:2]
+        x1 = int(max(0, x - margin))
+        y1 = int(max(0, y - margin))
+        x2 = int(min(region_w, x + tw + margin))
+        y2 = int(min(region_h, y + th + margin))
+        if x2 - x1 < tw or y2 - y1 < th:
+            return None
+        
+        result = cv2.matchTemplate(region_gray[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.confidence_threshold:
+            return None
+        return (x1 + max_loc[0], y1 + max_loc[1], tw, th), float(max_val)
+    
+    def _match_templates(self, small_gray, start_time, scales=None, threshold=None):
+        """對縮小後的灰階畫面執行所有模板匹配，回傳縮小座標系中的候選框
+        
+        Args:
+            scales: 模板絕對縮放比例列表（預設為 scale_factor × template_scales）
+            threshold: 峰值分數閾值（預設為 confidence_threshold）
+        
+        Returns:
+            (boxes, scores, template_ids)：boxes 為 (N, 4) 的 (x, y, w, h) 陣列
+        """
+        if threshold is None:
+            threshold = self.confidence_threshold
+        
+        # 🚀 效能優化：使用預縮放模板（只在載入或設定變更時縮放一次）
+        match_jobs = []
+        for scale in (scales or self._get_match_scales()):
+            scaled_templates = self._get_scaled_templates(scale)
+            match_jobs.extend(enumerate(scaled_templates))
+        
+        if self.matching_engine == 'fft':
+            match_results = self._run_match_jobs_fft(small_gray, match_jobs, start_time, threshold)
+        elif self.matching_workers > 1 and len(match_jobs) > 1:
+            match_results = self._run_match_jobs_parallel(small_gray, match_jobs, start_time, threshold)
+        else:
+            match_results = []
+            for i, (template_index, small_template) in enumerate(match_jobs):
+                # 🚀 效能優化：超時檢查（從設定檔讀取）
+                if time.time() - start_time > self.max_processing_time:
+                    self.logger.warning(f"⚠️ 檢測超時，已處理 {i}/{len(match_jobs)} 個模板")
+                    break
+                match_results.append(self._match_single_template(small_gray, template_index, small_template, threshold))
+        
+        all_boxes, all_scores, all_ids = [], [], []
+        for match_result in match_results:
+            if match_result is None:
+                continue
+            boxes, peak_scores, ids = match_result
+            all_boxes.append(boxes)
+            all_scores.append(peak_scores)
+            all_ids.append(ids)
+        
+        if not all_scores:
+            return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int32)
+        
+        return (np.concatenate(all_boxes).astype(np.float32),
+                np.concatenate(all_scores),
+                np.concatenate(all_ids))
+    
+    def _match_single_template(self, small_gray, template_index, small_template, threshold):
+        """單一模板匹配（可在工作執行緒中執行，cv2.matchTemplate 會釋放 GIL）"""
+        # 模板大於畫面時無法匹配
+        h, w = small_template.shape[:2]
+        if h > small_gray.shape[0] or w > small_gray.shape[1]:
+            return None
+        
+        result = cv2.matchTemplate(small_gray, small_template, cv2.TM_CCOEFF_NORMED)
+        return self._peaks_to_candidates(result, template_index, w, h, threshold)
+    
+    def _peaks_to_candidates(self, result, template_index, w, h, threshold):
+        """從相關圖取出所有峰值，轉為 (boxes, scores, ids) 候選框"""
+        xs, ys, peak_scores = MatchUtils.find_local_peaks(
+            result, threshold, self.max_detections,
+            neighborhood=min(h, w) // 2
+        )
+        if peak_scores.size == 0:
+            return None
+        
+        count = peak_scores.size
+        boxes = np.column_stack((xs, ys, np.full(count, w), np.full(count, h)))
+        return boxes, peak_scores, np.full(count, template_index, dtype=np.int32)
+    
+    def _run_match_jobs_fft(self, small_gray, match_jobs, start_time, threshold):
+        """🚀 頻域批次匹配：同尺寸模板共用一次畫面頻譜，結果依模板順序合併"""
+        groups = {}
+        for job_index, (template_index, small_template) in enumerate(match_jobs):
+            h, w = small_template.shape[:2]
+            if h > small_gray.shape[0] or w > small_gray.shape[1]:
+                continue
+            groups.setdefault((h, w), []).append((job_index, template_index, small_template))
+        
+        job_results = [None] * len(match_jobs)
+        for i, (size, group) in enumerate(groups.items()):
+            if time.time() - start_time > self.max_processing_time:
+                self.logger.warning(f"⚠️ 檢測超時，已處理 {i}/{len(groups)} 個模板尺寸群組")
+                break
+            
+            group_key = (size, tuple(id(t) for _, _, t in group))
+            score_maps = self.fft_matcher.match_group(small_gray, [t for _, _, t in group], group_key)
+            h, w = size
+            for (job_index, template_index, _), result in zip(group, score_maps):
+                job_results[job_index] = self._peaks_to_candidates(result, template_index, w, h, threshold)
+        
+        return job_results
+    
+    def _run_match_jobs_parallel(self, small_gray, match_jobs, start_time, threshold):
+        """🚀 以執行緒池平行匹配所有模板，結果依模板順序合併（確保結果穩定）"""
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._match_single_template, small_gray, template_index, small_template, threshold)
+            for template_index, small_template in match_jobs
+        ]
+        
+        remaining = max(0.0, self.max_processing_time - (time.time() - start_time))
+        done, not_done = wait(futures, timeout=remaining)
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            self.logger.warning(f"⚠️ 檢測超時，已處理 {len(done)}/{len(match_jobs)} 個模板")
+        
+        match_results = []
+        for future in futures:
+            if future in done:
+                try:
+                    match_results.append(future.result())
+                except Exception as e:
+                    self.logger.warning(f"⚠️ 模板匹配失敗: {e}")
+        return match_results
+    
+    def _get_executor(self):
+        """取得（必要時建立）模板匹配執行緒池"""
+        if self._match_executor is None:
+            with self._template_cache_lock:
+                if self._match_executor is None:
+                    self._match_executor = ThreadPoolExecutor(
+                        max_workers=self.matching_workers,
+                        thread_name_prefix="MonsterMatch"
+                    )
+        return self._match_executor
+    
+    def _shutdown_executor(self):
+        """關閉模板匹配執行緒池"""
+        executor = self._match_executor
+        self._match_executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    def close(self):
+        """釋放檢測器資源"""
+        self._shutdown_executor()
+    
+    def _build_results(self, boxes, scores, template_ids, track_ids=None):
+        """將候選框陣列包裝為欄位式檢測結果（不建立逐筆字典）"""
+        return Detections(boxes, scores, template_ids, self._get_template_names(),
+                          track_ids=track_ids,
+                          detection_level='tracked' if track_ids is not None else 'fast')
+    
+    def _get_template_names(self):
+        """模板名稱列表（模板集合變更時重建，檢測結果之間共用）"""
+        names = self._template_names
+        if names is None or len(names) != len(self.templates):
+            names = [t['name'] for t in self.templates]
+            self._template_names = names
+        return names
     
     def _load_templates(self):
         """載入模板 - 修復版，支援UTF-8編碼"""
@@ -115,7 +806,11 @@ class SimpleMonsterDetector:
                 self.logger.warning(f"⚠️ 模板目錄不存在: {self.template_dir}")
                 return
             
+            self.templates = []
+            self._invalidate_template_cache()
+            
             # 確保正確處理編碼
+            template_files = []
             for item in os.listdir(self.template_dir):
                 # 確保item是正確的字符串
                 if isinstance(item, bytes):
@@ -131,17 +826,21 @@ class SimpleMonsterDetector:
                             
                         if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
                             file_path = os.path.join(item_path, filename)
-                            full_name = f"{item}/{filename}"
-                            self.logger.info(f"🔍 載入模板: {full_name}")  # 調試輸出
-                            self._process_template(file_path, full_name)
+                            template_files.append((file_path, f"{item}/{filename}"))
                 
                 elif item.lower().endswith(('.png', '.jpg', '.jpeg')):
                     file_path = os.path.join(self.template_dir, item)
-                    self.logger.info(f"🔍 載入模板: {item}")  # 調試輸出
-                    self._process_template(file_path, item)
+                    template_files.append((file_path, item))
             
+            self._load_template_files(self.template_dir, template_files)
             self.logger.info(f"📁 已載入 {len(self.templates)} 個模板")
             
+            # 🎯 合併重複模板
+            self._deduplicate_templates()
+            
+            # 🚀 預先縮放模板
+            self._prepare_scaled_templates()
+            
             # 調試：顯示載入的模板名稱
             for i, template in enumerate(self.templates[:5]):  # 只顯示前5個
                 self.logger.info(f"  #{i+1}: {template['name']}")
@@ -151,6 +850,38 @@ class SimpleMonsterDetector:
             import traceback
             traceback.print_exc()
     
+    def _load_template_files(self, folder_path, template_files):
+        """⚡ 載入模板檔案列表：指紋相符時直接 mmap 模板包，否則逐檔處理並重建模板包
+        
+        Args:
+            folder_path: 模板資料夾（模板包以此命名）
+            template_files: [(檔案路徑, 模板名稱), ...]
+        """
+        fingerprint = None
+        if self.template_bundle_enabled and template_files:
+            try:
+                fingerprint = TemplateBundle.compute_fingerprint(template_files)
+                bundled = self.template_bundle.load(folder_path, fingerprint)
+            except OSError as e:
+                self.logger.warning(f"⚠️ 模板包指紋計算失敗: {e}")
+                fingerprint, bundled = None, None
+            
+            if bundled is not None:
+                for template in bundled:
+                    template['original_name'] = template['name']
+                    template['members'] = [template['name']]
+                self.templates.extend(bundled)
+                self.logger.info(f"⚡ 從模板包載入 {len(bundled)} 個模板")
+                return
+        
+        for file_path, template_name in template_files:
+            self.logger.info(f"🔍 載入模板: {template_name}")  # 調試輸出
+            self._process_template(file_path, template_name)
+        
+        if fingerprint and self.templates:
+            if self.template_bundle.save(folder_path, fingerprint, self.templates):
+                self.logger.info(f"💾 已建立模板包: {len(self.templates)} 個模板")
+    
     def _process_template(self, file_path, template_name):
         """處理單個模板 - 修復版，支援UTF-8編碼"""
         try:
@@ -178,12 +909,47 @@ class SimpleMonsterDetector:
                 'name': template_name,
                 'original_name': template_name,
                 'image': template_gray,
-                'size': template_gray.shape
+                'size': template_gray.shape,
+                'members': [template_name]  # 此模板代表的原始模板（去重後可能包含多個）
             })
         
         except Exception as e:
             self.logger.error(f"❌ 處理模板失敗 {template_name}: {e}")
     
+    def _deduplicate_templates(self):
+        """🎯 以正規化相關將同一怪物的模板分群，每群只保留一個代表模板
+        
+        只在同一怪物（同一資料夾）內比較，檢測結果的怪物名稱不受影響；
+        被合併的原始模板名稱記錄在代表模板的 'members' 中。
+        """
+        if not self.template_dedup_enabled or len(self.templates) < 2:
+            return
+        
+        representatives = []
+        for template in self.templates:
+            group = self._get_monster_group(template['name'])
+            best_rep, best_sim = None, self.template_dedup_threshold
+            for rep in representatives:
+                if self._get_monster_group(rep['name']) != group:
+                    continue
+                sim = MatchUtils.template_similarity(rep['image'], template['image'])
+                if sim >= best_sim:
+                    best_rep, best_sim = rep, sim
+            
+            if best_rep is not None:
+                best_rep['members'].extend(template['members'])
+            else:
+                representatives.append(template)
+        
+        if len(representatives) != len(self.templates):
+            self.logger.info(f"🎯 模板去重: {len(self.templates)} → {len(representatives)} 個代表模板")
+            self.templates = representatives
+            self._invalidate_template_cache()
+    
+    def _get_monster_group(self, template_name):
+        """取得模板所屬的怪物名稱（資料夾名稱，或檔名底線前的部分）"""
+        return template_name.split('/')[0] if '/' in template_name else template_name.split('_')[0]
+    
     def _get_display_name(self, template_name):
         """獲取清晰的顯示名稱，直接顯示原檔案名"""
         try:
@@ -232,14 +998,25 @@ class SimpleMonsterDetector:
             return None
             
     def load_templates_from_folder(self, folder_path: str) -> bool:
-        """從指定資料夾載入怪物模板 - 修復版，支援UTF-8編碼"""
+        """從指定資料夾載入怪物模板 - 修復版，支援UTF-8編碼
+        
+        只適用於自行建立的實例；註冊表中的共用實例以模板目錄為鍵被其他呼叫者取得，
+        不能原地更換模板，請改用 get_monster_detector(config, template_dir=folder_path)。
+        """
         try:
+            holders = get_detector_registry().refcount(self)
+            if holders > 0:
+                self.logger.error(f"❌ 共用檢測器（{holders} 個持有者）不能原地更換模板資料夾，"
+                                  f"請以 get_monster_detector(config, template_dir=...) 取得新實例: {folder_path}")
+                return False
+            
             if not os.path.exists(folder_path):
                 self.logger.error(f"❌ 找不到模板資料夾: {folder_path}")
                 return False
             
-            # 清空現有模板
+            # 清空現有模板（連同預縮放緩存）
             self.templates = []
+            self._invalidate_template_cache()
             
             # 載入新模板，確保正確處理編碼
             template_files = []
@@ -258,13 +1035,18 @@ class SimpleMonsterDetector:
             self.logger.info(f"🔍 找到 {len(template_files)} 個模板檔案")
             
             # 載入每個模板
-            for template_file in template_files:
-                template_path = os.path.join(folder_path, template_file)
-                self.logger.info(f"🔍 載入模板: {template_file}")  # 調試輸出
-                self._process_template(template_path, template_file)
+            self._load_template_files(
+                folder_path, [(os.path.join(folder_path, f), f) for f in template_files]
+            )
             
             self.logger.info(f"✅ 成功載入 {len(self.templates)} 個模板")
             
+            # 🎯 合併重複模板
+            self._deduplicate_templates()
+            
+            # 🚀 預先縮放模板
+            self._prepare_scaled_templates()
+            
             # 調試：顯示載入的模板名稱
             for i, template in enumerate(self.templates[:5]):  # 只顯示前5個
                 self.logger.info(f"  #{i+1}: {template['name']}")
@@ -281,6 +1063,26 @@ class SimpleMonsterDetector:
         """載入模板資料夾的別名方法（相容性）"""
         return self.load_templates_from_folder(folder_path)
     
+    def reload_templates(self) -> bool:
+        """重新載入自己的模板目錄（熱重載用，圖片未變更時直接使用模板包）
+        
+        新模板先載入到暫存檢測器，完成後才一次替換並遞增模板版本，
+        檢測中的執行緒不會看到載入到一半的模板集合，各執行緒的逐幀狀態隨之重建。
+        """
+        if not self.template_dir:
+            return False
+        loader = SimpleMonsterDetector(template_dir=self.template_dir, config=self.config)
+        try:
+            if not loader.templates:
+                self.logger.warning(f"⚠️ 熱重載沒有載入任何模板，保留原模板: {self.template_dir}")
+                return False
+            self._invalidate_template_cache(loader.templates)
+            self._prepare_scaled_templates()
+            self.logger.info(f"🔄 已重新載入 {len(self.templates)} 個模板: {self.template_dir}")
+            return True
+        finally:
+            loader.close()
+    
     # === 保持相容性的方法 ===
     
     def get_animation_info(self):
@@ -297,9 +1099,7 @@ class SimpleMonsterDetector:
         """保持原有介面相容性"""
         monster_names = set()
         for t in self.templates:
-            name = t['name']
-            base_name = name.split('/')[0] if '/' in name else name.split('_')[0]
-            monster_names.add(base_name)
+            monster_names.add(self._get_monster_group(t['name']))
         
         return {
             'loaded_monsters': len(monster_names),
@@ -315,6 +1115,7 @@ class SimpleMonsterDetector:
         return {
             'total_single_templates': len(self.templates),
             'template_names': [t['name'] for t in self.templates],
+            'template_members': {t['name']: list(t.get('members', [t['name']])) for t in self.templates},
             'detection_method': 'simple_template_matching'
         }
     
@@ -412,28 +1213,59 @@ class SimpleMonsterDetector:
             return None
     
 
-# === 全域函數保持相容性 ===
+class _DetectionState:
+    """單一呼叫執行緒的逐幀檢測狀態"""
+    
+    def __init__(self, template_generation):
+        self.template_generation = template_generation  # 建立時的模板版本，模板變更後整組重建
+        self.last_full_frame_time = 0  # ROI 模式上次全畫面掃描時間
+        self.last_motion_refresh_time = 0  # 運動遮罩模式上次全畫面刷新時間
+        self.motion_prev_small = None  # 上一幀的幀差縮圖
+        self.motion_last_hits = None  # 上次檢測結果 (boxes, scores, template_ids)，未重新匹配的區域沿用
+        self.monster_tracker = MonsterTracker()
+
+
+# === 批次檢測子行程 ===
 
-# 創建單一實例
-_monster_detector_instance = None
+_batch_worker_detector = None
 
-def get_monster_detector(config=None):
-    """獲取怪物檢測器實例"""
+def _init_batch_worker(config, templates):
+    """批次檢測子行程初始化：以父行程傳入的模板建立檢測器（不讀取模板目錄）"""
+    global _batch_worker_detector
+    detector = SimpleMonsterDetector(template_dir=None, config=config)
+    detector.templates = templates
+    detector._invalidate_template_cache()
+    detector._prepare_scaled_templates()
+    _batch_worker_detector = detector
+
+def _run_batch_worker(frames):
+    """子行程中批次檢測一段幀"""
+    return _batch_worker_detector.detect_batch(frames)
+
+
+# === 全域函數保持相容性 ===
+
+def get_monster_detector(config=None, template_dir="templates/monsters"):
+    """獲取共用的怪物檢測器實例（相同設定與模板目錄的呼叫者共用同一實例）"""
+    detector_logger = get_logger("MonsterDetector")
     try:
-        detector_logger = get_logger("MonsterDetector")
-        detector_logger.info("創建極簡怪物檢測器...")
-        detector = SimpleMonsterDetector(config=config)
+        registry = get_detector_registry()
+        detector = registry.acquire(SimpleMonsterDetector, config=config, template_dir=template_dir)
         
         # 獲取初始化資訊
         info = detector.get_monster_info()
-        detector_logger.info(f"極簡檢測器已初始化：{info['loaded_monsters']} 種怪物，{info['total_templates']} 個模板，閾值：{info['detection_threshold']}")
+        detector_logger.info(f"極簡檢測器已就緒：{info['loaded_monsters']} 種怪物，{info['total_templates']} 個模板，閾值：{info['detection_threshold']}")
         
         return detector
     except Exception as e:
-        detector_logger = get_logger("MonsterDetector")
         detector_logger.error(f"創建怪物檢測器失敗: {e}")
         return None
 
+def release_monster_detector(detector):
+    """釋放共用怪物檢測器的參考（最後一個持有者釋放時關閉執行緒池）"""
+    if detector is not None:
+        get_detector_registry().release(detector)
+
 def init_monster_detector(config=None):
     """初始化怪物檢測器"""
     return get_monster_detector(config)
@@ -0,0 +1,142 @@
+# includes/targeting_utils.py - 向量化怪物目標選擇
+
+"""
+向量化目標選擇（無狀態靜態方法）：
+- 一次計算所有怪物的相對座標、與角色的距離、依距離的排序
+- 以遮罩判斷攻擊/接近/追擊範圍
+- 優先維持鎖定的軌跡目標，否則選最近且可到達的怪物
+- MonsterDistances：排序後的結果只保存陣列，逐筆字典在存取時才建立
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+
+@dataclass
+class TargetingResult:
+    """目標選擇結果（所有陣列皆依距離由近到遠排序）"""
+    order: np.ndarray            # 排序後對應原始輸入的索引
+    rel_positions: np.ndarray    # (N, 2) 相對座標
+    distances: np.ndarray        # (N,) 與角色的距離
+    in_attack_range: np.ndarray  # (N,) 是否在攻擊範圍內
+    reachable: np.ndarray        # (N,) 是否在接近/追擊範圍內
+    target_rank: int = -1        # 選中目標在排序後的位置（-1 = 沒有可到達的目標）
+
+    @property
+    def has_target(self) -> bool:
+        return self.target_rank >= 0
+
+
+class TargetingUtils:
+    """向量化目標選擇工具類"""
+
+    @staticmethod
+    def evaluate(rel_positions: np.ndarray, character_pos: Tuple[float, float],
+                 attack_range: float, reach_range: float,
+                 track_ids: Optional[Sequence[int]] = None,
+                 locked_track_id: Optional[int] = None,
+                 distances: Optional[np.ndarray] = None) -> TargetingResult:
+        """計算距離、範圍遮罩並選出目標
+
+        Args:
+            rel_positions: (N, 2) 怪物中心相對座標
+            character_pos: 角色相對座標
+            attack_range: 攻擊範圍
+            reach_range: 可接近/追擊的最大距離
+            track_ids: (N,) 軌跡 ID（-1 表示沒有）
+            locked_track_id: 目前鎖定的軌跡 ID，仍可到達時優先選擇
+            distances: (N,) 已計算好的距離（例如 Detections.distances_to），None 時由座標計算
+
+        Returns:
+            TargetingResult
+        """
+        rel_positions = np.asarray(rel_positions, dtype=np.float32).reshape(-1, 2)
+        if distances is None:
+            delta = rel_positions - np.asarray(character_pos, dtype=np.float32)
+            distances = np.hypot(delta[:, 0], delta[:, 1])
+        else:
+            distances = np.asarray(distances, dtype=np.float32).reshape(-1)
+
+        order = np.argsort(distances, kind='stable')
+        distances = distances[order]
+        result = TargetingResult(
+            order=order,
+            rel_positions=rel_positions[order],
+            distances=distances,
+            in_attack_range=distances <= attack_range,
+            reachable=distances <= reach_range
+        )
+        if distances.size == 0:
+            return result
+
+        # 鎖定的軌跡仍在可到達範圍內時維持原目標，避免每次更新都換目標
+        if locked_track_id is not None and track_ids is not None:
+            sorted_ids = np.asarray(track_ids, dtype=np.int64)[order]
+            locked = np.flatnonzero((sorted_ids == locked_track_id) & result.reachable)
+            if locked.size:
+                result.target_rank = int(locked[0])
+                return result
+
+        # 否則選最近的怪物（排序後第一個），超出範圍則沒有目標
+        if result.reachable[0]:
+            result.target_rank = 0
+        return result
+
+
+class MonsterDistances:
+    """依距離排序的怪物列表（相容舊的距離字典列表，存取時才建立該筆字典）
+
+    每筆字典：{'monster', 'position', 'distance', 'confidence', 'detection_method', 'track_id'}
+    """
+
+    def __init__(self, targeting: TargetingResult, monsters, confidences: np.ndarray,
+                 track_ids: np.ndarray, detection_methods: Union[str, Sequence[str]],
+                 source_indices: Optional[np.ndarray] = None):
+        """
+        Args:
+            targeting: TargetingUtils.evaluate 的結果
+            monsters: 原始檢測結果（Detections 或列表），只在存取時以索引取出
+            confidences: (N,) 信心度（與 rel_positions 同順序）
+            track_ids: (N,) 軌跡 ID（-1 表示沒有）
+            detection_methods: 檢測方式（所有怪物相同時為字串）
+            source_indices: (N,) 對應 monsters 的索引（None 表示一一對應）
+        """
+        self.targeting = targeting
+        self.monsters = monsters
+        self.confidences = confidences
+        self.track_ids = track_ids
+        self.detection_methods = detection_methods
+        self.source_indices = source_indices
+
+    def __len__(self) -> int:
+        return int(self.targeting.order.shape[0])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        return (self[rank] for rank in range(len(self)))
+
+    def __getitem__(self, rank):
+        if isinstance(rank, slice):
+            return [self[i] for i in range(*rank.indices(len(self)))]
+        count = len(self)
+        if not -count <= rank < count:
+            raise IndexError(f"距離列表索引超出範圍: {rank}")
+        rank = int(rank) % count
+        index = int(self.targeting.order[rank])
+        source = int(self.source_indices[index]) if self.source_indices is not None else index
+        track_id = int(self.track_ids[index])
+        methods = self.detection_methods
+        return {
+            'monster': self.monsters[source],
+            'position': tuple(self.targeting.rel_positions[rank].tolist()),
+            'distance': float(self.targeting.distances[rank]),
+            'confidence': float(self.confidences[index]),
+            'detection_method': methods if isinstance(methods, str) else methods[index],
+            'track_id': None if track_id < 0 else track_id
+        }
+
+    def __repr__(self) -> str:
+        return f"MonsterDistances(count={len(self)}, target_rank={self.targeting.target_rank})"
@@ -0,0 +1,109 @@
+# includes/template_bundle_utils.py - 預編譯模板包
+
+"""
+預編譯模板包：
+- 將已處理（透明合成 + 灰階）的模板串接存成單一 .npy，索引（名稱、尺寸、偏移）存成 .json
+- 以模板檔案的路徑/大小/修改時間計算指紋，任何圖片變更時才重建
+- 熱啟動時以一次 mmap 載入所有模板，不需要逐檔解碼
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from includes.log_utils import get_logger
+
+BUNDLE_VERSION = 1
+
+
+class TemplateBundle:
+    """模板包讀寫工具（每個模板資料夾對應一組 .npy + .json）"""
+
+    def __init__(self, cache_dir: str = "data/cache/template_bundles"):
+        self.cache_dir = cache_dir
+        self.logger = get_logger("TemplateBundle")
+
+    @staticmethod
+    def compute_fingerprint(template_files: List[Tuple[str, str]]) -> str:
+        """計算模板集合指紋（名稱 + 檔案大小 + 修改時間）
+
+        Args:
+            template_files: [(檔案路徑, 模板名稱), ...]
+        """
+        digest = hashlib.sha1(f"v{BUNDLE_VERSION}".encode('utf-8'))
+        for file_path, name in sorted(template_files, key=lambda item: item[1]):
+            stat = os.stat(file_path)
+            digest.update(f"{name}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def load(self, template_dir: str, fingerprint: str) -> Optional[List[Dict]]:
+        """載入模板包，指紋不符或檔案不存在時回傳 None
+
+        Returns:
+            [{'name', 'image', 'size'}, ...]，image 為唯讀 mmap 視圖
+        """
+        data_path, index_path = self._get_paths(template_dir)
+        try:
+            if not (os.path.exists(data_path) and os.path.exists(index_path)):
+                return None
+
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != BUNDLE_VERSION or index.get('fingerprint') != fingerprint:
+                return None
+
+            data = np.load(data_path, mmap_mode='r')
+            templates = []
+            for entry in index.get('entries', []):
+                h, w = entry['shape']
+                offset = entry['offset']
+                image = data[offset:offset + h * w].reshape(h, w)
+                templates.append({'name': entry['name'], 'image': image, 'size': (h, w)})
+            return templates
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ 讀取模板包失敗，改為逐檔載入: {e}")
+            return None
+
+    def save(self, template_dir: str, fingerprint: str, templates: List[Dict]) -> bool:
+        """將已處理的模板寫入模板包（先寫暫存檔再替換，避免半成品）"""
+        if not templates:
+            return False
+
+        data_path, index_path = self._get_paths(template_dir)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            entries = []
+            offset = 0
+            for template in templates:
+                h, w = template['image'].shape[:2]
+                entries.append({'name': template['name'], 'shape': [h, w], 'offset': offset})
+                offset += h * w
+            data = np.concatenate([np.ascontiguousarray(t['image'], dtype=np.uint8).ravel() for t in templates])
+
+            tmp_data_path = data_path + '.tmp.npy'
+            tmp_index_path = index_path + '.tmp'
+            np.save(tmp_data_path, data)
+            with open(tmp_index_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': BUNDLE_VERSION,
+                    'fingerprint': fingerprint,
+                    'template_dir': os.path.abspath(template_dir),
+                    'entries': entries
+                }, f, ensure_ascii=False)
+
+            os.replace(tmp_data_path, data_path)
+            os.replace(tmp_index_path, index_path)
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ 寫入模板包失敗: {e}")
+            return False
+
+    def _get_paths(self, template_dir: str) -> Tuple[str, str]:
+        """模板包檔案路徑（以資料夾絕對路徑的雜湊命名）"""
+        key = hashlib.sha1(os.path.abspath(template_dir).encode('utf-8')).hexdigest()[:16]
+        base = os.path.join(self.cache_dir, f"templates_{key}")
+        return base + '.npy', base + '.json'
@@ -8,7 +8,7 @@ import yaml
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 # 只導入必要模組
-from modules.simple_capturer import SimpleCapturer
+from modules.frame_source import create_frame_source
 from modules.coordinate import TemplateMatcherTracker
 from modules.auto_combat_simple import SimpleCombat
 from modules.waypoint_editor import WaypointEditor
@@ -17,6 +17,8 @@ from modules.simple_waypoint_system import SimpleWaypointSystem
 from modules.health_mana_detector_hybrid import HealthManaDetectorHybrid  # HUD血條檢測（多模板匹配+填充分析）
 from modules.character_health_detector import CharacterHealthDetector  # 角色血條檢測
 from includes.config_utils import ConfigUtils
+from includes.detector_registry import get_detector_registry
+from includes.session_recorder_utils import SessionRecorder
 from includes.log_utils import get_logger
 
 
@@ -48,6 +50,13 @@ class MapleStoryHelper:
             'status_update': main_loop_config.get('status_update', 0.5)       # 2 FPS
         }
         
+        # 🎚️ 自適應追蹤頻率：移動中加快、靜止時逐步放慢（依追蹤器的速度估計）
+        self.adaptive_tracking_enabled = main_loop_config.get('adaptive_tracking_enabled', True)
+        self.position_tracking_min = main_loop_config.get('position_tracking_min', 0.03)
+        self.position_tracking_max = main_loop_config.get('position_tracking_max', 0.25)
+        self.tracking_speed_threshold = main_loop_config.get('tracking_speed_threshold', 0.02)
+        self.tracking_idle_backoff = main_loop_config.get('tracking_idle_backoff', 1.5)
+        
         # ✅ 效能優化：添加時間追蹤
         self.last_update_times = {
             'frame_capture': 0,
@@ -67,13 +76,16 @@ class MapleStoryHelper:
         from includes.simple_template_utils import get_monster_detector
         self.monster_detector = get_monster_detector(self.config)
         
-        # ✅ 分離的血條檢測器（多模板匹配+填充分析）
-        self.hud_health_detector = HealthManaDetectorHybrid(
+        # ✅ 分離的血條檢測器（多模板匹配+填充分析），透過註冊表與 GUI 共用
+        registry = get_detector_registry()
+        self.hud_health_detector = registry.acquire(
+            HealthManaDetectorHybrid,
             template_dir="templates/MainScreen",
             config=self.config
         )
-        self.character_health_detector = CharacterHealthDetector(
-            template_dir="templates/MainScreen", 
+        self.character_health_detector = registry.acquire(
+            CharacterHealthDetector,
+            template_dir="templates/MainScreen",
             config=self.config
         )
         self.last_health_check = 0
@@ -110,9 +122,12 @@ class MapleStoryHelper:
     def init_components(self):
         """只初始化核心組件 - 效能優化版"""
         try:
-            # 畫面捕獲 - 傳入完整的 config
+            # 畫面來源 - 依 capturer.source 選擇視窗捕捉或錄製畫面重播
             self.logger.info("初始化畫面捕獲...")
-            self.capturer = SimpleCapturer(config=self.config)
+            self.capturer = create_frame_source(self.config)
+            self.frame_subscription = None
+            self._start_frame_bus()
+            self.session_recorder = None
             
             # 角色追蹤 - 傳入對應的 config
             self.logger.info("初始化角色追蹤...")
@@ -264,6 +279,9 @@ class MapleStoryHelper:
             if not self.auto_combat.waypoint_system:
                 self.auto_combat.set_waypoint_system(self.waypoint_system)
         
+        self._start_frame_bus()
+        self._start_session_recorder()
+        
         self.is_enabled = True
         self._running = True
         self._thread = threading.Thread(target=self.main_loop, daemon=True)
@@ -289,15 +307,26 @@ class MapleStoryHelper:
                 current_time = time.time()
                 
                 # ✅ 效能優化：智能畫面捕捉
+                new_frame = False
+                timings = {}
                 if self.should_update('frame_capture'):
-                    frame = self.capturer.grab_frame()
+                    if self.frame_subscription is not None:
+                        # 📡 匯流排畫面：只在有新序號時更新，畫面唯讀共用不需複製
+                        packet = self.frame_subscription.read()
+                        frame = packet.frame if packet is not None else None
+                    else:
+                        # grab_frame 回傳的已是副本
+                        frame = self.capturer.grab_frame()
                     if frame is not None:
+                        new_frame = True
                         self.frame_cache = frame
                         self.cache_timestamp = current_time
+                        timings['frame_age'] = packet.age if self.frame_subscription is not None else 0.0
                         
                         # ✅ 添加歷史幀管理（運動檢測需要）
+                        # 匯流排畫面為唯讀視圖，直接放入歷史不複製；歷史幀只供幀差讀取，需要繪製時請先 copy()
                         if self.frame_history_enabled:
-                            self.frame_history.append(frame.copy())
+                            self.frame_history.append(frame)
                             # 保持歷史幀數量限制
                             if len(self.frame_history) > self.max_history_frames:
                                 self.frame_history.pop(0)
@@ -310,19 +339,32 @@ class MapleStoryHelper:
                 
                 # ✅ 效能優化：智能位置追蹤
                 rel_pos = None
+                tracked = False
                 if self.is_enabled and self.should_update('position_tracking'):
+                    stage_start = time.time()
                     rel_pos = self.tracker.track_player(frame)
+                    timings['tracking'] = time.time() - stage_start
+                    tracked = True
                     if rel_pos:
                         self.position_cache = rel_pos
+                    if self.adaptive_tracking_enabled:
+                        self._adapt_tracking_interval()
                 else:
-                    rel_pos = self.position_cache
+                    # 非追蹤幀：以濾波器外推目前位置，遺失時才用緩存
+                    rel_pos = self.tracker.predict_player_position() or self.position_cache
                 
                 # ✅ 效能優化：智能戰鬥更新
                 if (self.auto_combat and self.auto_combat.is_enabled and 
                     self.should_update('combat_update')):
                     # 傳遞歷史幀給戰鬥系統（用於運動檢測）
                     history_frames = self.frame_history if self.frame_history_enabled else None
+                    stage_start = time.time()
                     self.auto_combat.update(rel_pos, frame, frame_history=history_frames)
+                    timings['combat'] = time.time() - stage_start
+                
+                # ⏺️ 錄製新畫面與本輪處理結果（背景寫入，佇列滿時丟棄）
+                if new_frame and self.session_recorder is not None:
+                    self._record_session_frame(frame, rel_pos, tracked, timings)
                 
                 # ✅ 效能優化：降低血條檢查頻率
                 if self.should_update('health_check'):
@@ -356,6 +398,81 @@ class MapleStoryHelper:
         
         self.logger.info("主循環已停止")
     
+    def _adapt_tracking_interval(self):
+        """依角色速度與戰鬥移動狀態調整位置追蹤間隔"""
+        try:
+            estimate = self.tracker.get_position_estimate()
+            combat_moving = (self.auto_combat is not None and self.auto_combat.is_enabled and
+                             self.auto_combat.is_moving())
+            
+            if estimate is None or combat_moving:
+                # 位置遺失或正在移動：用最高頻率
+                interval = self.position_tracking_min
+            else:
+                vx, vy = estimate['velocity']
+                if (vx * vx + vy * vy) ** 0.5 >= self.tracking_speed_threshold:
+                    interval = self.position_tracking_min
+                else:
+                    # 靜止：逐步放慢到下限頻率
+                    interval = self.update_intervals['position_tracking'] * self.tracking_idle_backoff
+            
+            self.update_intervals['position_tracking'] = min(
+                self.position_tracking_max, max(self.position_tracking_min, interval))
+        except Exception as e:
+            self.logger.debug(f"追蹤頻率調整失敗: {e}")
+
+    def _start_frame_bus(self):
+        """啟動畫面匯流排：所有子系統共用同一次捕捉"""
+        capturer_config = self.config.get('capturer', {})
+        if not capturer_config.get('frame_bus_enabled', True):
+            return
+        try:
+            self.capturer.start_frame_bus(
+                interval=capturer_config.get('frame_bus_interval', self.update_intervals['frame_capture']),
+                ring_size=capturer_config.get('frame_bus_ring_size', 4)
+            )
+            self.frame_subscription = self.capturer.subscribe_frames("main_loop")
+        except Exception as e:
+            self.logger.warning(f"⚠️ 畫面匯流排啟動失敗，改為直接捕捉: {e}")
+            self.frame_subscription = None
+
+    def _start_session_recorder(self):
+        """依 recorder 設定開始錄製工作階段"""
+        recorder_config = self.config.get('recorder', {})
+        if not recorder_config.get('enabled', False) or self.session_recorder is not None:
+            return
+        try:
+            session_dir = os.path.join(recorder_config.get('output_dir', 'data/sessions'),
+                                       time.strftime('%Y%m%d_%H%M%S'))
+            self.session_recorder = SessionRecorder(
+                session_dir,
+                chunk_size=recorder_config.get('chunk_size', 120),
+                keyframe_interval=recorder_config.get('keyframe_interval', 30),
+                tile_size=recorder_config.get('tile_size', 32),
+                queue_size=recorder_config.get('queue_size', 16),
+                max_chunk_mb=recorder_config.get('max_chunk_mb', 64)
+            )
+            self.session_recorder.start()
+        except Exception as e:
+            self.logger.warning(f"⚠️ 錄製器啟動失敗: {e}")
+            self.session_recorder = None
+
+    def _stop_session_recorder(self):
+        """停止錄製並寫完剩餘畫面"""
+        if self.session_recorder is not None:
+            self.session_recorder.stop()
+            self.session_recorder = None
+
+    def _record_session_frame(self, frame, rel_pos, tracked, timings):
+        """錄製一張畫面與本輪的追蹤/戰鬥/血條結果"""
+        outputs = {'player_pos': rel_pos, 'tracked': tracked}
+        if self.auto_combat is not None:
+            monsters = getattr(self.auto_combat, '_last_monsters', None)
+            if monsters is not None:
+                outputs['monsters'] = monsters
+            outputs['health_bar_pos'] = getattr(self.auto_combat, 'character_health_bar_pos', None)
+        self.session_recorder.record(frame, outputs=outputs, timings=timings)
+
     def should_update(self, update_type):
         """✅ 效能優化：智能更新檢查"""
         current_time = time.time()
@@ -390,14 +507,30 @@ class MapleStoryHelper:
         self._running = False
         
         if hasattr(self, 'auto_combat'):
-            self.auto_combat.stop()
+            # 停止戰鬥並歸還戰鬥系統自行取得的檢測器
+            self.auto_combat.cleanup()
         
         # ✅ 效能優化：清理緩存
         self.frame_cache = None
         self.position_cache = None
+        self.tracker.reset_position_estimate()
+        self.capturer.stop_frame_bus()
+        self.frame_subscription = None
+        self._stop_session_recorder()
+        
+        # 釋放共用檢測器參考
+        self._release_detectors()
         
         self.logger.info("程式已停止")
     
+    def _release_detectors(self):
+        """釋放在註冊表取得的共用檢測器（重複呼叫安全）"""
+        registry = get_detector_registry()
+        for attr in ('monster_detector', 'hud_health_detector', 'character_health_detector'):
+            detector = getattr(self, attr, None)
+            if detector is not None and registry.release(detector):
+                setattr(self, attr, None)
+    
     def toggle_tracking(self):
         """切換追蹤"""
         self.is_enabled = not self.is_enabled
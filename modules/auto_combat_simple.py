@@ -3,7 +3,9 @@
 import time
 import random
 import numpy as np
-from includes.simple_template_utils import get_monster_detector
+from includes.simple_template_utils import get_monster_detector, release_monster_detector
+from includes.detection_utils import Detections
+from includes.targeting_utils import MonsterDistances, TargetingUtils
 from includes.movement_utils import MovementUtils
 from includes.grid_utils import GridUtils
 from includes.log_utils import get_logger
@@ -25,18 +27,13 @@ class SimpleCombat:
         self.action_duration = 0
         self.last_attack_time = 0
         
-        # 怪物檢測器 - 優先使用傳入的實例
+        # 怪物檢測器 - 優先使用傳入的實例（由傳入者負責釋放）
         self.monster_detector = monster_detector
+        self._owns_detector = False  # 是否由此處向註冊表取得，需在 cleanup() 釋放
         if not self.monster_detector:
             try:
-                from includes.simple_template_utils import get_monster_detector
                 self.monster_detector = get_monster_detector(config)
-                if not self.monster_detector:
-                    # 兼容舊版本：再次嘗試獲取檢測器
-                    try:
-                        self.monster_detector = get_monster_detector(self.config)
-                    except:
-                        self.monster_detector = None
+                self._owns_detector = self.monster_detector is not None
             except Exception as e:
                 self.logger = get_logger("SimpleCombat")
                 self.logger.error(f"怪物檢測器初始化失敗: {e}")
@@ -221,11 +218,13 @@ class SimpleCombat:
                 current_time = time.time()
                 # 戰鬥系統檢測頻率降低到5FPS（0.2秒間隔）
                 if current_time - self._last_detection_time >= 0.2:
+                    # 🎯 有血條定位時只檢測角色周圍（ROI 模式，由檢測器設定決定是否啟用）
+                    focus_point = self.character_health_bar_pos if self.use_health_bar_tracking else None
                     if hasattr(self.monster_detector, 'detect_monsters'):
                         if frame_history and len(frame_history) > 0:
-                            monsters = self.monster_detector.detect_monsters(frame, frame_history=frame_history)
+                            monsters = self.monster_detector.detect_monsters(frame, frame_history=frame_history, focus_point=focus_point)
                         else:
-                            monsters = self.monster_detector.detect_monsters(frame)
+                            monsters = self.monster_detector.detect_monsters(frame, focus_point=focus_point)
                     else:
                         monsters = self.monster_detector.detect_monsters(frame)
                     
@@ -241,56 +240,103 @@ class SimpleCombat:
             # 緩存檢測結果
             self._last_monsters = monsters
             
-            # 計算每個怪物與角色的距離
-            monster_distances = []
-            frame_height, frame_width = frame.shape[:2]
-            
-            for monster in monsters:
-                # 獲取怪物中心點
-                if isinstance(monster, dict):
-                    monster_x = monster.get('center_x', monster.get('x', 0))
-                    monster_y = monster.get('center_y', monster.get('y', 0))
-                    
-                    # 如果使用position屬性
-                    if 'position' in monster:
-                        monster_x, monster_y = monster['position']
-                        
-                    confidence = monster.get('confidence', 0.0)
-                    detection_method = monster.get('detection_method', 'shared_result')
-                    
-                elif isinstance(monster, (list, tuple)) and len(monster) >= 4:
-                    x, y, w, h = monster[:4]
-                    monster_x = x + w/2
-                    monster_y = y + h/2
-                    confidence = monster[4] if len(monster) > 4 else 0.0
-                    detection_method = 'legacy'
-                else:
-                    continue
-                
-                # 轉換為相對座標
-                monster_rel_x = monster_x / frame_width
-                monster_rel_y = monster_y / frame_height
-                
-                # 計算歐式距離
-                distance = self._calculate_distance(character_pos, (monster_rel_x, monster_rel_y))
-                
-                monster_distances.append({
-                    'monster': monster,
-                    'position': (monster_rel_x, monster_rel_y),
-                    'distance': distance,
-                    'confidence': confidence,
-                    'detection_method': detection_method
-                })
+            # ✅ 向量化目標選擇：一次計算所有怪物的相對座標、距離與範圍遮罩
+            arrays = self._extract_monster_arrays(monsters, frame.shape, character_pos)
+            rel_positions, distances, confidences, track_ids, detection_methods, source_indices = arrays
+            if rel_positions.shape[0] == 0:
+                return []
             
-            # 按距離排序，最近的在前面
-            monster_distances.sort(key=lambda x: x['distance'])
+            attack_range, reach_range = self._get_targeting_ranges()
+            current_target = getattr(self, 'auto_hunt_target', None)
+            locked_track_id = current_target.get('track_id') if current_target else None
+            targeting = TargetingUtils.evaluate(rel_positions, character_pos, attack_range, reach_range,
+                                                track_ids, locked_track_id, distances=distances)
             
-            return monster_distances
+            # 依距離排序（最近的在前面），只保存陣列，選中目標時才建立該筆字典
+            return MonsterDistances(targeting, monsters, confidences, track_ids,
+                                    detection_methods, source_indices)
             
         except Exception as e:
             self.logger.error(f"計算怪物距離失敗: {e}")
             return []
 
+    def _extract_monster_arrays(self, monsters, frame_shape, character_pos):
+        """將檢測結果轉為目標選擇用的陣列
+        
+        Returns:
+            (rel_positions (N, 2), distances (N,) 或 None, confidences (N,),
+             track_ids (N,) 無軌跡為 -1, detection_methods（字串或列表）,
+             source_indices (N,) 對應 monsters 的索引或 None)
+        """
+        # 欄位式結果：直接使用陣列，不建立逐筆字典
+        if isinstance(monsters, Detections):
+            rel_positions = monsters.relative_centers(frame_shape)
+            distances = monsters.distances_to(character_pos, frame_shape)
+            if monsters.track_ids is not None:
+                track_ids = monsters.track_ids.astype(np.int64)
+            else:
+                track_ids = np.full(len(monsters), -1, np.int64)
+            return rel_positions, distances, monsters.scores, track_ids, 'shared_result', None
+        
+        # 舊格式（字典或 (x, y, w, h[, conf]) 序列）
+        frame_height, frame_width = frame_shape[:2]
+        positions, confidences, track_ids, methods, indices = [], [], [], [], []
+        for index, monster in enumerate(monsters):
+            if isinstance(monster, dict):
+                monster_x = monster.get('center_x', monster.get('x', 0))
+                monster_y = monster.get('center_y', monster.get('y', 0))
+                if 'position' in monster:
+                    monster_x, monster_y = monster['position']
+                confidence = monster.get('confidence', 0.0)
+                detection_method = monster.get('detection_method', 'shared_result')
+                track_id = monster.get('track_id')
+            elif isinstance(monster, (list, tuple)) and len(monster) >= 4:
+                x, y, w, h = monster[:4]
+                monster_x = x + w/2
+                monster_y = y + h/2
+                confidence = monster[4] if len(monster) > 4 else 0.0
+                detection_method = 'legacy'
+                track_id = None
+            else:
+                continue
+            
+            positions.append((monster_x / frame_width, monster_y / frame_height))
+            confidences.append(confidence)
+            track_ids.append(-1 if track_id is None else track_id)
+            methods.append(detection_method)
+            indices.append(index)
+        
+        return (np.asarray(positions, dtype=np.float32).reshape(-1, 2), None,
+                np.asarray(confidences, dtype=np.float64), np.asarray(track_ids, dtype=np.int64),
+                methods, np.asarray(indices, dtype=np.int64))
+    
+    def _get_targeting_ranges(self):
+        """(攻擊範圍, 可接近/追擊的最大距離)"""
+        attack_range = self.hunt_settings.get('attack_range', 0.4)
+        approach_range = self.hunt_settings.get('approach_distance', 0.1) + attack_range
+        detection_range = self.hunt_settings.get('max_chase_distance', 0.15)
+        return attack_range, max(attack_range, approach_range, detection_range)
+    
+    def _get_targeting_for(self, monster_distances, current_pos):
+        """取得距離列表對應的目標選擇結果（calculate_distance_to_monsters 的結果直接使用）"""
+        if isinstance(monster_distances, MonsterDistances):
+            return monster_distances.targeting
+        
+        # 外部傳入的距離列表：重新以陣列計算
+        rel_positions = np.asarray([m['position'] for m in monster_distances], dtype=np.float32)
+        track_ids = np.asarray([-1 if m.get('track_id') is None else m['track_id'] for m in monster_distances],
+                               dtype=np.int64)
+        attack_range, reach_range = self._get_targeting_ranges()
+        current_target = getattr(self, 'auto_hunt_target', None)
+        locked_track_id = current_target.get('track_id') if current_target else None
+        targeting = TargetingUtils.evaluate(rel_positions, current_pos, attack_range, reach_range,
+                                            track_ids, locked_track_id)
+        # 列表順序可能與排序不同，對應回原列表位置
+        if targeting.has_target:
+            targeting.target_rank = int(targeting.order[targeting.target_rank])
+            targeting.in_attack_range = targeting.in_attack_range[np.argsort(targeting.order)]
+        return targeting
+
     def start(self):
         """啟動戰鬥系統"""
         try:
@@ -344,6 +390,14 @@ class SimpleCombat:
         except Exception as e:
             self.logger.error(f"停止戰鬥系統失敗: {e}")
 
+    def cleanup(self):
+        """停止戰鬥並釋放自行取得的共用怪物檢測器（程式結束時呼叫，重複呼叫安全）"""
+        self.stop()
+        if self._owns_detector:
+            release_monster_detector(self.monster_detector)
+            self._owns_detector = False
+            self.monster_detector = None
+
     def update(self, rel_pos, frame, frame_history=None):
         """✅ 整合血條檢測的戰鬥系統更新邏輯 - 支援歷史幀"""
         try:
@@ -617,6 +671,10 @@ class SimpleCombat:
         current_time = time.time()
         return (current_time - self.action_start_time) < self.action_duration
 
+    def is_moving(self):
+        """是否正在執行移動類動作（攻擊以外）"""
+        return self._is_action_in_progress() and self.current_action != "attack"
+
     def _start_action(self, action_type, duration):
         """開始執行動作"""
         self.current_action = action_type
@@ -645,48 +703,25 @@ class SimpleCombat:
         return 'right' if dx > 0 else 'left'
 
     def _update_monster_targeting_with_distance(self, monster_distances, current_pos):
-        """使用距離資訊更新怪物目標"""
+        """使用距離資訊更新怪物目標（使用向量化目標選擇的結果）"""
         try:
             if not monster_distances:
                 self.auto_hunt_target = None
                 return False
             
-            # 設定檢測範圍
-            attack_range = self.hunt_settings.get('attack_range', 0.4)
-            approach_range = self.hunt_settings.get('approach_distance', 0.1) + attack_range
-            detection_range = self.hunt_settings.get('max_chase_distance', 0.15)
-            
-            # 獲取最近的怪物
-            closest_monster = monster_distances[0]
-            closest_distance = closest_monster['distance']
-            
-            if closest_distance <= attack_range:
-                # 在攻擊範圍內
-                monster_info = closest_monster.copy()
-                monster_info['needs_approach'] = False
-                monster_info['in_range'] = True
-                self.auto_hunt_target = monster_info
-                return True
-                
-            elif closest_distance <= approach_range:
-                # 需要接近攻擊
-                monster_info = closest_monster.copy()
-                monster_info['needs_approach'] = True
-                monster_info['in_range'] = False
-                self.auto_hunt_target = monster_info
-                return True
-                
-            elif closest_distance <= detection_range:
-                # 在檢測範圍內，需要大幅接近
-                monster_info = closest_monster.copy()
-                monster_info['needs_approach'] = True
-                monster_info['in_range'] = False
-                self.auto_hunt_target = monster_info
-                return True
+            # 有追蹤ID時優先鎖定原目標，否則選最近的怪物；超出範圍則沒有目標
+            targeting = self._get_targeting_for(monster_distances, current_pos)
+            if not targeting.has_target:
+                self.auto_hunt_target = None
+                return False
             
-            # 超出檢測範圍
-            self.auto_hunt_target = None
-            return False
+            rank = targeting.target_rank
+            in_range = bool(targeting.in_attack_range[rank])
+            monster_info = monster_distances[rank].copy()
+            monster_info['needs_approach'] = not in_range
+            monster_info['in_range'] = in_range
+            self.auto_hunt_target = monster_info
+            return True
             
         except Exception as e:
             self.logger.error(f"更新怪物目標失敗: {e}")
@@ -899,9 +934,8 @@ class SimpleCombat:
         try:
             pass
             
-            # 記錄起始位置
-            frame = self.ro_helper.capturer.grab_frame()
-            start_pos = self.ro_helper.tracker.track_player(frame)
+            # 記錄起始位置（讀取主迴圈的位置估計，不在戰鬥執行緒重複檢測）
+            start_pos = self.ro_helper.tracker.predict_player_position()
             if not start_pos:
                 start_pos = (0.5, 0.5)
             
@@ -941,8 +975,7 @@ class SimpleCombat:
             return
         
         try:
-            frame = self.ro_helper.capturer.grab_frame()
-            current_pos = self.ro_helper.tracker.track_player(frame)
+            current_pos = self.ro_helper.tracker.predict_player_position()
             
             if current_pos:
                 timestamp = time.time() - self.horizontal_test_start
@@ -1046,22 +1079,20 @@ class SimpleCombat:
             if not pre_move_pos:
                 return False
             
-            # 獲取移動後位置
-            if hasattr(self, 'ro_helper') and hasattr(self.ro_helper, 'capturer'):
-                frame = self.ro_helper.capturer.grab_frame()
-                if frame and hasattr(self.ro_helper, 'tracker'):
-                    current_pos = self.ro_helper.tracker.track_player(frame)
-                    if current_pos:
-                        # 檢查垂直位置變化
-                        vertical_change = abs(current_pos[1] - pre_move_pos[1])
-                        
-                        pass
+            # 獲取移動後位置（主迴圈的位置估計）
+            if hasattr(self, 'ro_helper') and hasattr(self.ro_helper, 'tracker'):
+                current_pos = self.ro_helper.tracker.predict_player_position()
+                if current_pos:
+                    # 檢查垂直位置變化
+                    vertical_change = abs(current_pos[1] - pre_move_pos[1])
+                    
+                    pass
+                    pass
+                    
+                    # 如果垂直位置變化超過0.1（10%），視為掉落
+                    if vertical_change > 0.1:
                         pass
-                        
-                        # 如果垂直位置變化超過0.1（10%），視為掉落
-                        if vertical_change > 0.1:
-                            pass
-                            return True
+                        return True
             
             return False
             
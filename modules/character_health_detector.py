@@ -16,6 +16,9 @@ class CharacterHealthDetector:
     專門檢測角色頭頂的血條，使用單一結構化模板匹配
     """
     
+    # 註冊表比對設定時只看角色血條區段
+    config_sections = ('simple_character_health',)
+    
     def __init__(self, template_dir="templates/MainScreen", config=None):
         """初始化角色血條檢測器"""
         self.template_dir = template_dir
@@ -3,10 +3,12 @@
 import cv2
 import numpy as np
 import os
+import threading
 from PIL import Image
 import time
 from collections import deque
 from includes.log_utils import get_logger
+from includes.kalman_utils import PositionKalmanFilter
 
 def simple_coordinate_conversion(canvas_x, canvas_y, canvas_size, minimap_size):
     """AutoMaple風格：極簡座標轉換"""
@@ -27,6 +29,15 @@ def simple_coordinate_conversion(canvas_x, canvas_y, canvas_size, minimap_size):
 class TemplateMatcherTracker:
     """純AutoMaple風格角色追蹤"""
     
+    # 預處理用銳化核（只建立一次）
+    _SHARPEN_KERNEL = np.array([[-0.5, -0.5, -0.5],
+                                [-0.5, 5.0, -0.5],
+                                [-0.5, -0.5, -0.5]], dtype=np.float32)
+    _MILD_SHARPEN_KERNEL = np.array([[-0.3, -0.3, -0.3],
+                                     [-0.3, 3.4, -0.3],
+                                     [-0.3, -0.3, -0.3]], dtype=np.float32)
+    _MAX_PREPROCESS_BUFFERS = 16
+    
     def __init__(self, config, capturer=None):
         self.logger = get_logger(__name__)
         tcfg = config['template_matcher']
@@ -44,13 +55,42 @@ class TemplateMatcherTracker:
         if self.player_template is None:
             raise FileNotFoundError(f"找不到角色模板: {player_path}")
         self.player_threshold = tcfg.get('player_threshold', 0.7)
+        
+        # 🟡 HSV 顏色預篩：以黃色色塊定位玩家標記，模板匹配只用於確認/區分
+        self.use_hsv_filter = tcfg.get('use_hsv_filter', True)
+        self.hsv_yellow_lower = np.array(tcfg.get('hsv_yellow_lower', [20, 100, 100]), dtype=np.uint8)
+        self.hsv_yellow_upper = np.array(tcfg.get('hsv_yellow_upper', [35, 255, 255]), dtype=np.uint8)
+        self.player_verify_margin = tcfg.get('player_verify_margin', 3)
+        self._player_blob_area = self._count_template_marker_pixels(player_path)
         self.minimap_corner_threshold = tcfg.get('minimap_corner_threshold', 0.7)
         self.use_gray_only_for_corners = True
         self.use_edge_templates = False
         self.use_enhanced_preprocessing = False
         self.use_hybrid_templates = False
         self.last_player_pos_rel = (0.5, 0.5)
+        
+        # 📈 位置估計：等速卡爾曼濾波取代固定比例平滑，漏檢時以預測值輸出
+        self.position_filter = PositionKalmanFilter(
+            process_noise=tcfg.get('position_process_noise', 2.0),
+            measurement_noise=tcfg.get('position_measurement_noise', 0.003),
+            max_prediction_time=tcfg.get('max_prediction_time', 0.5),
+            reset_distance=tcfg.get('position_reset_distance', 0.2)
+        )
         self.cropped_minimap_img = None
+        
+        # 🎯 小地圖鎖定：找到後只在原位置附近驗證，失敗或定時才全畫面搜索
+        self.minimap_lock_enabled = tcfg.get('minimap_lock_enabled', True)
+        self.minimap_verify_margin = tcfg.get('minimap_verify_margin', 8)
+        self.minimap_full_search_interval = tcfg.get('minimap_full_search_interval', 5.0)
+        self._locked_minimap_rect = None
+        self._last_full_minimap_search = 0
+        # 主迴圈、GUI 顯示與戰鬥執行緒共用追蹤器：鎖定狀態與位置濾波器只在此鎖內讀寫
+        self._state_lock = threading.RLock()
+        
+        # 🚀 ROI 預處理：全畫面搜索只處理可能出現小地圖的區域 (x1, y1, x2, y2 相對座標)
+        self.minimap_search_region = tuple(tcfg.get('minimap_search_region', [0.0, 0.0, 0.5, 0.5]))
+        # 主迴圈、GUI 顯示執行緒與戰鬥執行緒都會呼叫檢測，CLAHE 與緩衝區各執行緒分開持有
+        self._preprocess_local = threading.local()
         self.threshold_stats = {
             'successful_thresholds': {},
             'total_attempts': 0,
@@ -66,7 +106,8 @@ class TemplateMatcherTracker:
         )
 
     def track_player(self, frame):
-        """追蹤玩家位置"""
+        """追蹤玩家位置（濾波後；本幀漏檢時回傳預測位置，遺失過久回傳 None）"""
+        now = time.time()
         try:
             if frame is None:
                 return None
@@ -74,7 +115,7 @@ class TemplateMatcherTracker:
             # 檢測小地圖區域
             minimap_rect = self._find_minimap_with_subpixel_accuracy(frame)
             if minimap_rect is None:
-                return None
+                return self._predict_locked(now)
             
             # 提取小地圖圖像
             x1, y1, x2, y2 = minimap_rect
@@ -83,46 +124,195 @@ class TemplateMatcherTracker:
             # 檢測玩家標記
             player_pos = self._detect_player_marker(minimap_img)
             if player_pos is None:
-                return None
+                return self._predict_locked(now)
             
             # 轉換為相對座標
             rel_pos = self._minimap_to_relative(player_pos, minimap_img.shape)
+            if rel_pos is None:
+                return self._predict_locked(now)
             
-            # 平滑處理
-            if hasattr(self, 'last_position') and self.last_position:
-                rel_pos = self._smooth_position(rel_pos)
-            
-            self.last_position = rel_pos
-            return rel_pos
+            # 卡爾曼濾波
+            with self._state_lock:
+                return self.position_filter.update(rel_pos, now)
             
         except Exception as e:
             self.logger.error(f"玩家追蹤失敗: {e}")
             return None
 
+    def predict_player_position(self, timestamp=None):
+        """預測指定時間（預設現在）的玩家位置，不做任何檢測；遺失時回傳 None"""
+        return self._predict_locked(time.time() if timestamp is None else timestamp)
+
+    def _predict_locked(self, timestamp):
+        """在追蹤器鎖內讀取濾波器預測（避免讀到更新到一半的狀態）"""
+        with self._state_lock:
+            return self.position_filter.predict(timestamp)
+
+    def get_position_estimate(self, timestamp=None):
+        """目前的位置估計（位置、速度、位置共變異數、距上次觀測秒數）"""
+        now = time.time() if timestamp is None else timestamp
+        with self._state_lock:
+            position = self.position_filter.predict(now)
+            if position is None:
+                return None
+            return {
+                'position': position,
+                'velocity': self.position_filter.velocity,
+                'covariance': self.position_filter.predict_covariance(now),
+                'age': now - self.position_filter.last_update
+            }
+
+    def reset_position_estimate(self):
+        """清除位置估計（換地圖或停止時呼叫）"""
+        with self._state_lock:
+            self.position_filter.reset()
+
     def _can_use_subpixel(self, correlation_map, peak_x, peak_y):
         """檢查是否可以使用亞像素精度"""
         return (peak_x > 0 and peak_y > 0 and 
                 peak_x < correlation_map.shape[1] - 1 and 
                 peak_y < correlation_map.shape[0] - 1)
 
-    def _find_minimap_with_subpixel_accuracy(self, frame):
-        """✅ 簡化版：固定高閾值小地圖檢測"""
+    def _find_minimap_with_subpixel_accuracy(self, frame, update_lock=True):
+        """✅ 簡化版：固定高閾值小地圖檢測（鎖定後只在原位置附近驗證）
+        
+        Args:
+            frame: 遊戲畫面
+            update_lock: 是否更新小地圖鎖定狀態（顯示用的唯讀檢測傳 False）
+        """
         # 只在需要時轉換灰階
         if len(frame.shape) == 3:
             gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         else:
             gray_frame = frame
-            
-        # ✅ 圖像預處理提升準確率
-        gray_frame = self._preprocess_gray_image(gray_frame)
+        
+        # 🔒 取鎖定狀態快照，檢測在鎖外進行，結果再於鎖內寫回
+        now = time.time()
+        with self._state_lock:
+            locked_rect = self._locked_minimap_rect
+            last_full_search = self._last_full_minimap_search
+        
+        # 🎯 已鎖定：只處理小地圖大小的區域
+        if (self.minimap_lock_enabled and locked_rect is not None and
+                now - last_full_search < self.minimap_full_search_interval):
+            result = self._verify_locked_minimap(gray_frame, locked_rect)
+            if result:
+                if update_lock:
+                    self._commit_minimap_lock(locked_rect, result)
+                return result
+            self.logger.debug("小地圖鎖定驗證失敗，改為全畫面搜索")
+        
+        # 🚀 只取可能出現小地圖的搜索區域
+        ox, oy, search_gray = self._crop_search_region(gray_frame)
+        
+        # ✅ 圖像預處理提升準確率（只處理搜索區域，重用緩衝區）
+        search_gray = self._preprocess_gray_image(search_gray, reuse_buffers=True)
         
         # ✅ 使用固定高閾值 0.8
-        result = self._try_detect_minimap(gray_frame, self.minimap_corner_threshold)
+        result = self._try_detect_minimap(search_gray, self.minimap_corner_threshold)
+        if result:
+            result = (result[0] + ox, result[1] + oy, result[2] + ox, result[3] + oy)
+        if update_lock:
+            self._commit_minimap_lock(locked_rect, result, full_search_time=now)
         if result:
             return result
         
         return None
     
+    def _commit_minimap_lock(self, expected_rect, new_rect, full_search_time=None):
+        """寫回小地圖鎖定結果
+        
+        只有鎖定狀態仍是檢測前的快照時才寫入，避免較慢的執行緒以舊畫面的結果覆蓋較新的鎖定
+        """
+        with self._state_lock:
+            if self._locked_minimap_rect != expected_rect:
+                return
+            self._locked_minimap_rect = new_rect
+            if full_search_time is not None:
+                self._last_full_minimap_search = full_search_time
+    
+    def get_minimap_rect(self):
+        """目前鎖定的小地圖位置 (x1, y1, x2, y2)，不做任何檢測；尚未鎖定時回傳 None"""
+        with self._state_lock:
+            return self._locked_minimap_rect
+    
+    def _verify_locked_minimap(self, gray_frame, locked_rect):
+        """在鎖定的小地圖位置附近（外擴 margin）重新定位四個角點
+        
+        Args:
+            gray_frame: 灰階畫面
+            locked_rect: 檢測前取得的鎖定位置快照
+        
+        Returns:
+            (x1, y1, x2, y2) 或 None（角點未找到或尺寸改變）
+        """
+        x1, y1, x2, y2 = locked_rect
+        frame_h, frame_w = gray_frame.shape[:2]
+        margin = self.minimap_verify_margin
+        rx1, ry1 = max(0, x1 - margin), max(0, y1 - margin)
+        rx2, ry2 = min(frame_w, x2 + margin), min(frame_h, y2 + margin)
+        
+        region = self._preprocess_gray_image(gray_frame[ry1:ry2, rx1:rx2], reuse_buffers=True)
+        if any(t.shape[0] > region.shape[0] or t.shape[1] > region.shape[1] for t in self.corner_templates.values()):
+            return None
+        
+        result = self._try_detect_minimap(region, self.minimap_corner_threshold)
+        if result is None:
+            return None
+        
+        nx1, ny1, nx2, ny2 = result[0] + rx1, result[1] + ry1, result[2] + rx1, result[3] + ry1
+        # 尺寸改變（例如切換地圖）時視為驗證失敗
+        if abs((nx2 - nx1) - (x2 - x1)) > 2 or abs((ny2 - ny1) - (y2 - y1)) > 2:
+            return None
+        
+        return (nx1, ny1, nx2, ny2)
+    
+    def _crop_search_region(self, gray_frame):
+        """依 minimap_search_region 裁切全畫面搜索區域
+        
+        Returns:
+            (offset_x, offset_y, 區域灰階圖)
+        """
+        frame_h, frame_w = gray_frame.shape[:2]
+        rx1, ry1, rx2, ry2 = self.minimap_search_region
+        x1, y1 = int(frame_w * rx1), int(frame_h * ry1)
+        x2, y2 = int(frame_w * rx2), int(frame_h * ry2)
+        if x2 - x1 <= 0 or y2 - y1 <= 0:
+            return 0, 0, gray_frame
+        return x1, y1, gray_frame[y1:y2, x1:x2]
+    
+    def _get_thread_cache(self, name):
+        """取得目前執行緒專用的緩存字典（CLAHE 物件與預處理緩衝區不跨執行緒共用）"""
+        cache = getattr(self._preprocess_local, name, None)
+        if cache is None:
+            cache = {}
+            setattr(self._preprocess_local, name, cache)
+        return cache
+    
+    def _get_clahe(self, clip_limit):
+        """取得緩存的 CLAHE 物件（避免每幀 cv2.createCLAHE）"""
+        clahe_cache = self._get_thread_cache('clahe')  # {clipLimit: CLAHE 物件}
+        clahe = clahe_cache.get(clip_limit)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+            clahe_cache[clip_limit] = clahe
+        return clahe
+    
+    def _get_preprocess_buffer(self, name, shape, enabled):
+        """取得目前執行緒指定用途與尺寸的預配置緩衝區（未啟用時回傳 None 讓 OpenCV 自行配置）"""
+        if not enabled:
+            return None
+        buffers = self._get_thread_cache('buffers')  # {(用途, 尺寸): 預先配置的緩衝區}
+        key = (name, shape)
+        buffer = buffers.get(key)
+        if buffer is None:
+            # ROI 尺寸變動過多時清除舊緩衝區，避免記憶體持續成長
+            if len(buffers) >= self._MAX_PREPROCESS_BUFFERS:
+                buffers.clear()
+            buffer = np.empty(shape, np.uint8)
+            buffers[key] = buffer
+        return buffer
+
     def _try_detect_minimap(self, gray_frame, threshold):
         locs = {}
         corners_found = 0
@@ -130,12 +320,14 @@ class TemplateMatcherTracker:
         for key, tmpl in self.corner_templates.items():
             best_match_val = 0
             best_match_loc = None
+            best_match_map = None  # 保留最佳相關圖供亞像素定位重用
             best_template_type = "none"
             if use_gray_only:
                 res = cv2.matchTemplate(gray_frame, tmpl, cv2.TM_CCOEFF_NORMED)
                 min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
                 best_match_val = max_val
                 best_match_loc = max_loc
+                best_match_map = res
                 best_template_type = "gray"
             else:
                 if self.use_edge_templates:
@@ -145,6 +337,7 @@ class TemplateMatcherTracker:
                     if max_val > best_match_val:
                         best_match_val = max_val
                         best_match_loc = max_loc
+                        best_match_map = res
                         best_template_type = "edge"
                 if self.use_hybrid_templates and hasattr(self, 'original_templates'):
                     original_tmpl = self.original_templates[key]
@@ -154,6 +347,7 @@ class TemplateMatcherTracker:
                     if max_val > best_match_val:
                         best_match_val = max_val
                         best_match_loc = max_loc
+                        best_match_map = res_original
                         best_template_type = "original"
                 if self.use_hybrid_templates:
                     res_gray = cv2.matchTemplate(gray_frame, tmpl, cv2.TM_CCOEFF_NORMED)
@@ -161,15 +355,15 @@ class TemplateMatcherTracker:
                     if max_val > best_match_val:
                         best_match_val = max_val
                         best_match_loc = max_loc
+                        best_match_map = res_gray
                         best_template_type = "gray"
             if best_match_val >= threshold:
                 corners_found += 1
                 peak_x, peak_y = best_match_loc
-                if (peak_x > 0 and peak_y > 0 and 
-                    peak_x < gray_frame.shape[1] - 1 and peak_y < gray_frame.shape[0] - 1):
+                # ✅ 直接重用角點搜索的相關圖，不再重新計算 matchTemplate
+                if self._can_use_subpixel(best_match_map, peak_x, peak_y):
                     subpix_x, subpix_y = self._subpixel_peak_location(
-                        cv2.matchTemplate(gray_frame, tmpl, cv2.TM_CCOEFF_NORMED), 
-                        peak_x, peak_y
+                        best_match_map, peak_x, peak_y
                     )
                     peak_x, peak_y = subpix_x, subpix_y
                 if 'left' in key:
@@ -190,9 +384,15 @@ class TemplateMatcherTracker:
                 return (int(x1), int(y1), int(x2), int(y2))
         return None
 
-    def _preprocess_gray_image(self, gray_img):
-        """✅ 增強版：多種預處理方法提升模板獨特性"""
+    def _preprocess_gray_image(self, gray_img, reuse_buffers=False):
+        """✅ 增強版：多種預處理方法提升模板獨特性
+        
+        Args:
+            gray_img: 灰階圖（通常為搜索區域或小地圖裁切）
+            reuse_buffers: 寫入目前執行緒的預配置緩衝區（結果在同執行緒下次同尺寸呼叫前有效）
+        """
         try:
+            shape = gray_img.shape[:2]
             if self.use_enhanced_preprocessing:
                 # ✅ 方案1：邊緣檢測預處理 (適合邊緣模板)
                 if self.use_edge_templates:
@@ -215,37 +415,36 @@ class TemplateMatcherTracker:
                 # ✅ 方案2：對比度增強預處理 (適合原始模板)
                 else:
                     # 1. 強對比度增強
-                    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))  # 降低clipLimit
-                    enhanced = clahe.apply(gray_img)
+                    enhanced = self._get_clahe(2.0).apply(
+                        gray_img, self._get_preprocess_buffer('clahe', shape, reuse_buffers))  # 降低clipLimit
                     
                     # 2. 銳化處理 - 使用更溫和的核
-                    kernel = np.array([[-0.5,-0.5,-0.5],
-                                     [-0.5, 5.0,-0.5],
-                                     [-0.5,-0.5,-0.5]])
-                    sharpened = cv2.filter2D(enhanced, -1, kernel)
+                    sharpened = cv2.filter2D(enhanced, -1, self._SHARPEN_KERNEL,
+                                             dst=self._get_preprocess_buffer('sharpen', shape, reuse_buffers))
                     
                     # 3. 正規化
-                    normalized = cv2.normalize(sharpened, None, 0, 255, cv2.NORM_MINMAX)
+                    normalized = cv2.normalize(sharpened, self._get_preprocess_buffer('normalize', shape, reuse_buffers),
+                                               0, 255, cv2.NORM_MINMAX)
                     
                     return normalized
             
             else:
                 # ✅ 方案3：原始溫和預處理
                 # 1. 輕微高斯模糊減少雜訊
-                blurred = cv2.GaussianBlur(gray_img, (3, 3), 0.5)
+                blurred = cv2.GaussianBlur(gray_img, (3, 3), 0.5,
+                                           dst=self._get_preprocess_buffer('blur', shape, reuse_buffers))
                 
                 # 2. 輕微直方圖均衡化
-                clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8,8))  # 更溫和的參數
-                equalized = clahe.apply(blurred)
+                equalized = self._get_clahe(1.5).apply(
+                    blurred, self._get_preprocess_buffer('clahe', shape, reuse_buffers))  # 更溫和的參數
                 
                 # 3. 溫和銳化
-                kernel = np.array([[-0.3,-0.3,-0.3],
-                                 [-0.3, 3.4,-0.3],
-                                 [-0.3,-0.3,-0.3]])
-                sharpened = cv2.filter2D(equalized, -1, kernel)
+                sharpened = cv2.filter2D(equalized, -1, self._MILD_SHARPEN_KERNEL,
+                                         dst=self._get_preprocess_buffer('sharpen', shape, reuse_buffers))
                 
                 # 4. 正規化
-                normalized = cv2.normalize(sharpened, None, 0, 255, cv2.NORM_MINMAX)
+                normalized = cv2.normalize(sharpened, self._get_preprocess_buffer('normalize', shape, reuse_buffers),
+                                           0, 255, cv2.NORM_MINMAX)
                 
                 return normalized
             
@@ -433,12 +632,30 @@ class TemplateMatcherTracker:
     def set_gray_only_for_corners(self, value: bool):
         self.use_gray_only_for_corners = value
 
+    def _count_template_marker_pixels(self, template_path):
+        """計算玩家模板中落在黃色 HSV 範圍的像素數（作為色塊面積基準）"""
+        try:
+            template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+            if template is None:
+                return 0
+            hsv = cv2.cvtColor(template, cv2.COLOR_BGR2HSV)
+            return int(cv2.countNonZero(cv2.inRange(hsv, self.hsv_yellow_lower, self.hsv_yellow_upper)))
+        except Exception as e:
+            self.logger.warning(f"計算玩家模板色塊面積失敗: {e}")
+            return 0
+
     def _detect_player_marker(self, minimap_img):
-        """檢測玩家標記"""
+        """檢測玩家標記（HSV 色塊快速路徑，失敗時退回全小地圖模板匹配）"""
         try:
             if minimap_img is None:
                 return None
             
+            # 🟡 快速路徑：黃色色塊質心（亞像素）
+            if self.use_hsv_filter and len(minimap_img.shape) == 3 and self._player_blob_area > 0:
+                player_pos = self._detect_player_marker_hsv(minimap_img)
+                if player_pos is not None:
+                    return player_pos
+            
             # 轉換為灰階
             if len(minimap_img.shape) == 3:
                 gray_minimap = cv2.cvtColor(minimap_img, cv2.COLOR_BGR2GRAY)
@@ -461,6 +678,51 @@ class TemplateMatcherTracker:
             self.logger.error(f"玩家標記檢測失敗: {e}")
             return None
 
+    def _detect_player_marker_hsv(self, minimap_img):
+        """以 HSV 黃色遮罩 + 連通元件定位玩家標記
+        
+        - 只有一個面積合理的色塊：直接回傳其質心
+        - 多個色塊：在各色塊附近做小範圍模板匹配，取分數最高且過閾值者
+        
+        Returns:
+            (x, y) 浮點小地圖座標，找不到時回傳 None
+        """
+        hsv = cv2.cvtColor(minimap_img, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, self.hsv_yellow_lower, self.hsv_yellow_upper)
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if count <= 1:
+            return None
+        
+        # 過濾面積不合理的色塊（忽略背景標籤 0）
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        valid = np.flatnonzero((areas >= self._player_blob_area * 0.5) &
+                               (areas <= self._player_blob_area * 2.0)) + 1
+        if valid.size == 0:
+            return None
+        if valid.size == 1:
+            cx, cy = centroids[valid[0]]
+            return (float(cx), float(cy))
+        
+        # 多個候選：以模板匹配區分
+        gray_minimap = cv2.cvtColor(minimap_img, cv2.COLOR_BGR2GRAY)
+        th, tw = self.player_template.shape
+        img_h, img_w = gray_minimap.shape
+        margin = self.player_verify_margin
+        best_score, best_pos = self.player_threshold, None
+        for label in valid:
+            cx, cy = centroids[label]
+            x1 = max(0, int(cx) - tw // 2 - margin)
+            y1 = max(0, int(cy) - th // 2 - margin)
+            x2 = min(img_w, int(cx) + tw - tw // 2 + margin)
+            y2 = min(img_h, int(cy) + th - th // 2 + margin)
+            if x2 - x1 < tw or y2 - y1 < th:
+                continue
+            result = cv2.matchTemplate(gray_minimap[y1:y2, x1:x2], self.player_template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, _ = cv2.minMaxLoc(result)
+            if score >= best_score:
+                best_score, best_pos = score, (float(cx), float(cy))
+        return best_pos
+
     def _minimap_to_relative(self, player_pos, minimap_shape):
         """將小地圖座標轉換為相對座標"""
         try:
@@ -484,24 +746,6 @@ class TemplateMatcherTracker:
             self.logger.error(f"座標轉換失敗: {e}")
             return None
 
-    def _smooth_position(self, new_pos, smooth_factor=0.8):
-        """平滑位置更新"""
-        try:
-            if not hasattr(self, 'last_player_pos_rel'):
-                self.last_player_pos_rel = new_pos
-                return new_pos
-            
-            # 平滑處理
-            smoothed_x = self.last_player_pos_rel[0] * smooth_factor + new_pos[0] * (1 - smooth_factor)
-            smoothed_y = self.last_player_pos_rel[1] * smooth_factor + new_pos[1] * (1 - smooth_factor)
-            
-            self.last_player_pos_rel = (smoothed_x, smoothed_y)
-            return (smoothed_x, smoothed_y)
-            
-        except Exception as e:
-            self.logger.error(f"位置平滑處理失敗: {e}")
-            return new_pos
-
 
 # =============== 統一座標轉換函式 ===============
 
@@ -0,0 +1,287 @@
+# modules/frame_source.py - 畫面來源選擇與錄製畫面重播
+
+"""
+畫面來源：
+- window：SimpleCapturer 視窗捕捉（只在選用時才載入 win32 模組）
+- images：依檔名順序重播資料夾中的圖片
+- video：重播影片檔
+- archive：重播 np.savez_compressed 畫面檔（frames + 可選 timestamps）
+- session：重播 SessionRecorder 錄製的工作階段資料夾
+
+重播速度：
+- realtime：依畫面時間戳對齊實際時間（未到時間回傳上一張，落後時跳過畫面）
+- fast：每次取畫面都前進一張，盡可能快
+"""
+
+import os
+import time
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+from includes.frame_source_utils import FrameSource
+from includes.session_recorder_utils import SessionReader
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class ReplayFrameSource(FrameSource):
+    """錄製畫面重播基底類別 - 子類別實作 _read_next / _rewind"""
+
+    name = "replay"
+
+    def __init__(self, pace: str = "realtime", loop: bool = False, fps: float = 30.0, speed: float = 1.0):
+        """
+        Args:
+            pace: realtime（依時間戳播放）或 fast（每次呼叫前進一張）
+            loop: 播放完畢後是否從頭開始
+            fps: 沒有時間戳時使用的畫面率
+            speed: realtime 模式的播放倍速
+        """
+        super().__init__()
+        self.pace = pace
+        self.loop = loop
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.speed = speed if speed and speed > 0 else 1.0
+        self.finished = False
+        self.frames_read = 0
+        self.frames_skipped = 0
+        self._index = 0
+        self._pending = None  # 已讀出但尚未到播放時間的畫面
+        self._start_wall = None
+        self._start_ts = None
+
+    # === 子類別介面 ===
+
+    def _read_next(self) -> Tuple[Optional[np.ndarray], Optional[float]]:
+        """讀取下一張畫面與其時間戳（秒，None 表示依 fps 推算），結束時回傳 (None, None)"""
+        raise NotImplementedError("子類別必須實作 _read_next")
+
+    def _rewind(self):
+        """回到第一張畫面"""
+        raise NotImplementedError("子類別必須實作 _rewind")
+
+    # === 播放控制 ===
+
+    def _next_packet(self) -> Tuple[Optional[np.ndarray], Optional[float]]:
+        frame, timestamp = self._read_next()
+        if frame is None and self.loop and self._index > 0:
+            self._rewind()
+            self._index = 0
+            self._start_wall = None
+            frame, timestamp = self._read_next()
+        if frame is None:
+            if not self.finished:
+                self.logger.info(f"⏹️ 重播結束（共 {self.frames_read} 張）")
+            self.finished = True
+            return None, None
+        if timestamp is None:
+            timestamp = self._index / self.fps
+        self._index += 1
+        self.frames_read += 1
+        return frame, timestamp
+
+    def _grab_frame_direct(self) -> Optional[np.ndarray]:
+        try:
+            if self.pace != "realtime":
+                frame, _ = self._next_packet()
+                return self._store_frame(frame)
+
+            now = time.time()
+            if self._pending is None:
+                self._pending = self._next_packet()
+            frame, timestamp = self._pending
+            if frame is None:
+                return self.frame_cache
+            if self._start_wall is None:
+                self._start_wall, self._start_ts = now, timestamp
+            elapsed = (now - self._start_wall) * self.speed
+
+            if timestamp - self._start_ts > elapsed:
+                # 還沒到下一張的播放時間：維持目前畫面
+                return self.frame_cache
+
+            # 落後時跳到最接近目前時間的畫面
+            while True:
+                next_frame, next_ts = self._next_packet()
+                if next_frame is None or self._start_wall is None or next_ts - self._start_ts > elapsed:
+                    # 尚未到時間、播放結束或剛循環回開頭（下次重新對齊時間）
+                    self._pending = (next_frame, next_ts)
+                    break
+                frame, timestamp = next_frame, next_ts
+                self.frames_skipped += 1
+            return self._store_frame(frame)
+
+        except Exception as e:
+            self.logger.error(f"重播讀取失敗: {e}")
+            return self.frame_cache
+
+    def get_capture_info(self):
+        info = super().get_capture_info()
+        info.update({
+            'pace': self.pace,
+            'frames_read': self.frames_read,
+            'frames_skipped': self.frames_skipped,
+            'finished': self.finished,
+            'is_connected': not self.finished  # 重播結束後視為來源已斷開
+        })
+        return info
+
+
+class ImageDirectorySource(ReplayFrameSource):
+    """依檔名順序重播資料夾中的圖片（支援UTF-8路徑）"""
+
+    name = "images"
+
+    def __init__(self, folder: str, **kwargs):
+        super().__init__(**kwargs)
+        self.folder = folder
+        self.files: List[str] = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(IMAGE_EXTENSIONS))
+        self._file_index = 0
+        self.logger.info(f"🖼️ 圖片重播: {folder} ({len(self.files)} 張)")
+
+    def _read_next(self):
+        while self._file_index < len(self.files):
+            path = self.files[self._file_index]
+            self._file_index += 1
+            frame = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame, None
+            self.logger.warning(f"無法讀取圖片: {path}")
+        return None, None
+
+    def _rewind(self):
+        self._file_index = 0
+
+
+class VideoFileSource(ReplayFrameSource):
+    """重播影片檔（時間戳取自影片播放位置）"""
+
+    name = "video"
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"無法開啟影片: {path}")
+        video_fps = self.capture.get(cv2.CAP_PROP_FPS)
+        if video_fps and video_fps > 0:
+            self.fps = video_fps
+        self.logger.info(f"🎞️ 影片重播: {path} ({self.fps:.1f} FPS)")
+
+    def _read_next(self):
+        ok, frame = self.capture.read()
+        if not ok:
+            return None, None
+        position = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+        return frame, (position / 1000.0 if position > 0 else None)
+
+    def _rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def cleanup(self):
+        super().cleanup()
+        self.capture.release()
+
+
+class FrameArchiveSource(ReplayFrameSource):
+    """重播壓縮畫面檔（np.savez_compressed，frames: (N, H, W, 3)，timestamps: (N,) 可選）"""
+
+    name = "archive"
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        with np.load(path) as archive:
+            self.frames = archive['frames']
+            self.timestamps = archive['timestamps'] if 'timestamps' in archive.files else None
+        self._frame_index = 0
+        self.logger.info(f"📦 畫面檔重播: {path} ({len(self.frames)} 張)")
+
+    def _read_next(self):
+        if self._frame_index >= len(self.frames):
+            return None, None
+        i = self._frame_index
+        self._frame_index += 1
+        timestamp = float(self.timestamps[i] - self.timestamps[0]) if self.timestamps is not None else None
+        return self.frames[i].copy(), timestamp
+
+    def _rewind(self):
+        self._frame_index = 0
+
+
+class SessionReplaySource(ReplayFrameSource):
+    """重播 SessionRecorder 錄製的工作階段（時間戳取自錄製時間）"""
+
+    name = "session"
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.reader = SessionReader(path)
+        self._frame_index = 0
+        self._first_timestamp = None
+        self.last_meta = None  # 目前畫面錄製時的處理結果，可用於比對
+        self.logger.info(f"📼 工作階段重播: {path} ({len(self.reader)} 張)")
+
+    def _read_next(self):
+        if self._frame_index >= len(self.reader):
+            return None, None
+        frame, meta = self.reader.read(self._frame_index)
+        self._frame_index += 1
+        if self._first_timestamp is None:
+            self._first_timestamp = meta['timestamp']
+        self.last_meta = meta
+        return frame, meta['timestamp'] - self._first_timestamp
+
+    def _rewind(self):
+        self._frame_index = 0
+        self._first_timestamp = None
+
+    def cleanup(self):
+        super().cleanup()
+        self.reader.close()
+
+
+REPLAY_SOURCES = {
+    'images': ImageDirectorySource,
+    'video': VideoFileSource,
+    'archive': FrameArchiveSource,
+    'session': SessionReplaySource
+}
+
+
+def create_frame_source(config) -> FrameSource:
+    """依 capturer.source 設定建立畫面來源
+
+    Args:
+        config: 完整設定字典
+
+    Returns:
+        FrameSource 實例
+    """
+    capturer_config = (config or {}).get('capturer', {})
+    source = capturer_config.get('source', 'window')
+
+    if source == 'window':
+        # 只有視窗捕捉需要 win32 模組
+        from modules.simple_capturer import SimpleCapturer
+        return SimpleCapturer(config=config)
+
+    source_class = REPLAY_SOURCES.get(source)
+    if source_class is None:
+        raise ValueError(f"未知的畫面來源: {source}（可用: window, {', '.join(REPLAY_SOURCES)}）")
+
+    path = capturer_config.get('replay_path', '')
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"找不到重播來源: {path}")
+
+    return source_class(
+        path,
+        pace=capturer_config.get('replay_pace', 'realtime'),
+        loop=capturer_config.get('replay_loop', False),
+        fps=capturer_config.get('replay_fps', 30.0),
+        speed=capturer_config.get('replay_speed', 1.0)
+    )
@@ -24,6 +24,9 @@ class HealthManaDetectorHybrid:
     結合模板匹配定位和填充分析，增加OCR數字識別
     """
     
+    # HUD 相關設定區段（檢測器註冊表只比對這些區段）
+    config_sections = ('hud_health', 'hud_mana', 'hud_exp', 'hud_detection', 'hud_ocr')
+    
     def __init__(self, template_dir="templates/MainScreen", config=None):
         """
         初始化HUD血條檢測器 - 單模板匹配版本
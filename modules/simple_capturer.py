@@ -5,8 +5,11 @@ import numpy as np
 import cv2
 import time
 import ctypes
+from ctypes import wintypes
 from includes.log_utils import get_logger
 from includes.config_utils import create_config_section
+from includes.frame_source_utils import FrameSource
+from includes.capture_backend_utils import CaptureBackend, CaptureContext
 
 # PrintWindow API 宣告 - 修復版
 try:
@@ -22,11 +25,107 @@ try:
 except AttributeError:
     PW_RENDERFULLCONTENT = 0x00000002
 
-class SimpleCapturer:
+# GDI 函式宣告（句柄需為指標寬度，避免 64 位元下被截斷）
+_user32 = ctypes.windll.user32
+_gdi32 = ctypes.windll.gdi32
+_user32.GetWindowDC.argtypes = [wintypes.HWND]
+_user32.GetWindowDC.restype = wintypes.HDC
+_user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+_gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+_gdi32.CreateCompatibleDC.restype = wintypes.HDC
+_gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.c_void_p, wintypes.UINT,
+                                    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+_gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+_gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+_gdi32.SelectObject.restype = wintypes.HGDIOBJ
+_gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+_gdi32.DeleteDC.argtypes = [wintypes.HDC]
+
+DIB_RGB_COLORS = 0
+
+
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', wintypes.DWORD), ('biWidth', wintypes.LONG), ('biHeight', wintypes.LONG),
+        ('biPlanes', wintypes.WORD), ('biBitCount', wintypes.WORD), ('biCompression', wintypes.DWORD),
+        ('biSizeImage', wintypes.DWORD), ('biXPelsPerMeter', wintypes.LONG), ('biYPelsPerMeter', wintypes.LONG),
+        ('biClrUsed', wintypes.DWORD), ('biClrImportant', wintypes.DWORD)
+    ]
+
+
+class GDICaptureBackend(CaptureBackend):
+    """PrintWindow 捕捉後端：記憶體 DC 與 DIB Section 在視窗尺寸不變時持續重用
+    
+    DIB Section 的像素記憶體直接包成 NumPy 視圖，PrintWindow 寫入後不需要 GetBitmapBits 複製。
+    """
+    
+    name = "gdi"
+    
+    def __init__(self):
+        self._mem_dc = None
+        self._bitmap = None
+        self._old_bitmap = None
+    
+    def get_size(self, hwnd):
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        return (right - left, bottom - top)
+    
+    def open(self, hwnd, width, height):
+        self.close()
+        window_dc = _user32.GetWindowDC(hwnd)
+        if not window_dc:
+            raise Exception("GetWindowDC failed")
+        try:
+            mem_dc = _gdi32.CreateCompatibleDC(window_dc)
+            if not mem_dc:
+                raise Exception("CreateCompatibleDC failed")
+            
+            header = _BITMAPINFOHEADER()
+            header.biSize = ctypes.sizeof(_BITMAPINFOHEADER)
+            header.biWidth = width
+            header.biHeight = -height  # 負值 = 由上而下，與 NumPy 列順序一致
+            header.biPlanes = 1
+            header.biBitCount = 32
+            bits = ctypes.c_void_p()
+            bitmap = _gdi32.CreateDIBSection(window_dc, ctypes.byref(header), DIB_RGB_COLORS,
+                                             ctypes.byref(bits), None, 0)
+            if not bitmap or not bits.value:
+                _gdi32.DeleteDC(mem_dc)
+                raise Exception("CreateBitmap failed")
+        finally:
+            _user32.ReleaseDC(hwnd, window_dc)
+        
+        self._mem_dc = mem_dc
+        self._bitmap = bitmap
+        self._old_bitmap = _gdi32.SelectObject(mem_dc, bitmap)
+        buffer = (ctypes.c_uint8 * (width * height * 4)).from_address(bits.value)
+        return np.ctypeslib.as_array(buffer).reshape(height, width, 4)
+    
+    def render(self, hwnd):
+        result = _PrintWindow(hwnd, self._mem_dc, PW_RENDERFULLCONTENT)
+        if result != 1:
+            raise Exception(f"PrintWindow 返回失敗代碼: {result}")
+        _gdi32.GdiFlush()
+        return True
+    
+    def close(self):
+        if self._mem_dc:
+            if self._old_bitmap:
+                _gdi32.SelectObject(self._mem_dc, self._old_bitmap)
+            if self._bitmap:
+                _gdi32.DeleteObject(self._bitmap)
+            _gdi32.DeleteDC(self._mem_dc)
+        self._mem_dc = None
+        self._bitmap = None
+        self._old_bitmap = None
+
+class SimpleCapturer(FrameSource):
     """簡化版視窗捕獲器 - 專注於楓之谷 Worlds"""
     
+    name = "window"
+    
     def __init__(self, config=None):
-        self.logger = get_logger("SimpleCapturer")
+        super().__init__("SimpleCapturer")
         self.config = config
         
         # 從配置讀取設定
@@ -34,13 +133,19 @@ class SimpleCapturer:
             config_section = create_config_section(config, 'capturer')
             self.window_title = config_section.get_string('window_title', 'MapleStory Worlds-Artale (繁體中文版)')
             self.capture_mode = config_section.get_string('capture_mode', 'window')
+            capturer_config = config.get('capturer', {})
+            # ⏱️ 依設定的間隔限制實際捕捉頻率
+            self.configure_rate_limit(
+                cache_duration=capturer_config.get('cache_duration', 0.05),
+                min_interval=capturer_config.get('min_capture_interval', 0.02),
+                max_interval=capturer_config.get('max_capture_interval', 0.1),
+                max_duty=capturer_config.get('max_capture_duty', 0.5)
+            )
         else:
             self.window_title = 'MapleStory Worlds-Artale (繁體中文版)'
             self.capture_mode = 'window'
         
         # 基本屬性
-        self.frame_cache = None
-        self.cache_timestamp = 0
         self.error_count = 0
         self.window_handle = None
         
@@ -49,6 +154,9 @@ class SimpleCapturer:
         self.last_gdi_cleanup = time.time()
         self.cleanup_interval = 30  # 每30秒檢查一次
         
+        # 🖼️ 持久捕捉上下文（視窗尺寸不變時重用 DC/位圖）
+        self.capture_context = CaptureContext(GDICaptureBackend())
+        
         # 初始化視窗
         self._init_window()
         
@@ -123,6 +231,7 @@ class SimpleCapturer:
         self.logger.info(f"🔄 強制重新連接視窗: {self.window_title}")
         self.error_count = 0
         self.frame_cache = None
+        self.capture_context.invalidate()
         
         if self.window_title:
             self.window_handle = self._find_window(self.window_title)
@@ -138,12 +247,7 @@ class SimpleCapturer:
             return False
     
     def _capture_window(self, hwnd):
-        """使用 PrintWindow 捕獲視窗"""
-        hwndDC = None
-        mfcDC = None
-        saveDC = None
-        saveBitMap = None
-        
+        """使用 PrintWindow 捕獲視窗（經由持久捕捉上下文）"""
         try:
             # 預檢查：確保視窗仍然有效
             if not win32gui.IsWindow(hwnd):
@@ -153,68 +257,18 @@ class SimpleCapturer:
                 else:
                     return None
             
-            # 獲取視窗大小
-            try:
-                left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-                width = right - left
-                height = bottom - top
-            except Exception as e:
-                self.logger.warning(f"獲取視窗大小失敗: {e}")
-                return None
-            
-            if width <= 0 or height <= 0:
-                self.logger.warning(f"視窗尺寸無效: {width}x{height}")
+            img = self.capture_context.capture(hwnd)
+            if img is None:
+                self.logger.warning("視窗尺寸無效")
                 return None
             
-            # 建立GDI資源
-            hwndDC = win32gui.GetWindowDC(hwnd)
-            if not hwndDC:
-                raise Exception("GetWindowDC failed")
-            
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            if not mfcDC:
-                raise Exception("CreateDCFromHandle failed")
-            
-            saveDC = mfcDC.CreateCompatibleDC()
-            if not saveDC:
-                raise Exception("CreateCompatibleDC failed")
-            
-            saveBitMap = win32ui.CreateBitmap()
-            if not saveBitMap:
-                raise Exception("CreateBitmap failed")
-            
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-            
-            # 使用 PrintWindow 抓圖
-            try:
-                # 嘗試使用 win32con 的常數
-                result = _PrintWindow(hwnd, saveDC.GetSafeHdc(), win32con.PW_RENDERFULLCONTENT)
-            except AttributeError:
-                # 如果沒有 PW_RENDERFULLCONTENT，使用數值 2
-                result = _PrintWindow(hwnd, saveDC.GetSafeHdc(), 2)
-            except Exception as e:
-                raise Exception(f"PrintWindow API call failed - {e}")
-            
-            if result != 1:
-                raise Exception(f"PrintWindow 返回失敗代碼: {result}")
-            
-            # 獲取位圖資料
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = np.frombuffer(bmpstr, dtype='uint8')
-            img.shape = (height, width, 4)
-            
-            # 轉換為 BGR 格式
-            img = img[..., :3]
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            
             # 重置GDI錯誤計數
             self.gdi_error_count = 0
             return img
                 
         except Exception as e:
             self.logger.error(f"PrintWindow 捕獲失敗: {e}")
+            self.capture_context.invalidate()
             
             # 統計 GDI 相關錯誤
             if any(keyword in str(e) for keyword in ["CreateCompatibleDC", "CreateBitmap", "GetWindowDC"]):
@@ -223,43 +277,9 @@ class SimpleCapturer:
                     self.logger.warning("連續 GDI 錯誤，執行強制清理")
                     self._force_gdi_cleanup()
             return None
-            
-        finally:
-            # 資源清理
-            resources_released = []
-            
-            if saveBitMap:
-                try:
-                    win32gui.DeleteObject(saveBitMap.GetHandle())
-                    resources_released.append("BitMap")
-                except:
-                    pass
-            
-            if saveDC:
-                try:
-                    saveDC.DeleteDC()
-                    resources_released.append("SaveDC")
-                except:
-                    pass
-            
-            if mfcDC:
-                try:
-                    mfcDC.DeleteDC()
-                    resources_released.append("MfcDC")
-                except:
-                    pass
-            
-            if hwndDC:
-                try:
-                    win32gui.ReleaseDC(hwnd, hwndDC)
-                    resources_released.append("WindowDC")
-                except:
-                    pass
-            
-            # 資源已釋放，不再輸出日誌以減少噪音
     
-    def grab_frame(self):
-        """抓取視窗畫面"""
+    def _grab_frame_direct(self):
+        """直接以 PrintWindow 抓取視窗畫面"""
         try:
             current_time = time.time()
             
@@ -342,7 +362,8 @@ class SimpleCapturer:
     
     def cleanup(self):
         """清理資源"""
-        self.frame_cache = None
+        super().cleanup()
+        self.capture_context.close()
         self.window_handle = None
         self._force_gdi_cleanup()
         self.logger.info("✅ 簡化版捕獲器資源已清理")
@@ -352,12 +373,13 @@ class SimpleCapturer:
         is_connected = (self.window_handle is not None and 
                        win32gui.IsWindow(self.window_handle) if self.window_handle else False)
         
-        return {
+        info = super().get_capture_info()
+        info.update({
             'window_title': self.window_title,
             'capture_mode': self.capture_mode,
             'window_handle': self.window_handle,
             'is_connected': is_connected,
-            'has_cache': self.frame_cache is not None,
             'error_count': self.error_count,
             'gdi_error_count': self.gdi_error_count
-        } 
\ No newline at end of file
+        })
+        return info 
\ No newline at end of file
@@ -22,7 +22,8 @@ from modules.coordinate import TemplateMatcherTracker   # 已經在 ro_helper.tr
 from modules.health_mana_detector_hybrid import HealthManaDetectorHybrid  # HUD血條檢測（多模板匹配+填充分析）
 from includes.simple_template_utils import UITemplateHelper
 from includes.log_utils import get_logger
-from includes.simple_template_utils import get_monster_detector
+from includes.simple_template_utils import get_monster_detector, release_monster_detector
+from includes.detector_registry import get_detector_registry
 # 簡化方案：使用OpenCV基本文字渲染，避免複雜的中文處理
 
 # 添加父目錄到 Python 路徑
@@ -158,14 +159,19 @@ class MonsterDetectionGUI(QMainWindow):
         try:
             from modules.character_health_detector import CharacterHealthDetector
             
+            # ✅ 透過註冊表取得共用檢測器（與主程式相同設定時不重複載入模板）
+            registry = get_detector_registry()
+            
             # 初始化HUD血魔條檢測器
-            self.health_detector = HealthManaDetectorHybrid(
+            self.health_detector = registry.acquire(
+                HealthManaDetectorHybrid,
                 template_dir="templates/MainScreen",
                 config=self.config
             )
             
             # 初始化角色血條檢測器
-            self.character_health_detector = CharacterHealthDetector(
+            self.character_health_detector = registry.acquire(
+                CharacterHealthDetector,
                 template_dir="templates/MainScreen",
                 config=self.config
             )
@@ -213,9 +219,10 @@ class MonsterDetectionGUI(QMainWindow):
                     import signal
                     
                     # ✅ 使用簡化檢測以避免當機
-                    # 不傳入歷史幀，避免復雜的時序融合處理
+                    # 歷史幀只用於運動遮罩（由檢測器設定決定是否啟用）
                     start_time = time.time()
-                    monsters = self.monster_detector.detect_monsters(frame, frame_history=None)  # 改為None
+                    focus_point = self._get_detection_focus_point(frame)
+                    monsters = self.monster_detector.detect_monsters(frame, frame_history=self.frame_history, focus_point=focus_point)
                     detection_time = time.time() - start_time
                     
                     self.logger.debug(f"簡化檢測到 {len(monsters)} 隻怪物 (耗時: {detection_time:.3f}秒)")
@@ -300,6 +307,26 @@ class MonsterDetectionGUI(QMainWindow):
             traceback.print_exc()
             return None, [], {}
     
+    def _get_detection_focus_point(self, frame):
+        """🎯 由上一次的角色血條結果估算角色畫面位置（ROI 檢測用，相對座標）"""
+        try:
+            with self._detection_lock:
+                health_bars = self._shared_results.get('character_health_bars', [])
+            if not health_bars or len(health_bars[0]) < 4:
+                return None
+            
+            x, y, w, h = health_bars[0][:4]
+            frame_height, frame_width = frame.shape[:2]
+            
+            # 角色通常在血條正下方（與戰鬥系統的估算方式一致）
+            center_x = (x + w / 2) / frame_width
+            center_y = (y + h / 2 + h * 1.5) / frame_height
+            return (center_x, center_y)
+            
+        except Exception as e:
+            self.logger.debug(f"估算檢測焦點失敗: {e}")
+            return None
+    
     def _add_frame_to_history(self, frame):
         """添加幀到歷史記錄 - 修復版"""
         if frame is not None:
@@ -1825,10 +1852,11 @@ class MonsterDetectionGUI(QMainWindow):
             return None
 
     def _get_minimap_rect(self, frame):
-        """獲取小地圖位置"""
+        """獲取小地圖位置（優先使用主迴圈鎖定的位置，不改動追蹤器狀態）"""
         try:
             if hasattr(self.ro_helper, 'tracker') and self.ro_helper.tracker:
-                return self.ro_helper.tracker._find_minimap_with_subpixel_accuracy(frame)
+                tracker = self.ro_helper.tracker
+                return tracker.get_minimap_rect() or tracker._find_minimap_with_subpixel_accuracy(frame, update_lock=False)
             return None
         except Exception as e:
             self.logger.debug(f"獲取小地圖位置失敗: {e}")
@@ -1859,6 +1887,47 @@ class MonsterDetectionGUI(QMainWindow):
             self.logger.error(f"繪製角色血條失敗: {e}")
             return frame
 
+    def _switch_monster_template_folder(self, folder_path):
+        """改用指定模板資料夾的怪物檢測器
+        
+        以資料夾為鍵從註冊表另外取得實例，不修改主程式/戰鬥共用的實例。
+        """
+        detector = get_monster_detector(self.config, template_dir=folder_path)
+        if detector is None:
+            return False
+        if not detector.templates:
+            self.logger.warning(f"模板資料夾沒有可用的模板: {folder_path}")
+            release_monster_detector(detector)
+            return False
+        
+        with self._detection_lock:
+            old_detector, self.monster_detector = self.monster_detector, detector
+        # 歸還舊實例的參考（資料夾未變時為同一實例，歸還多取得的一次）
+        release_monster_detector(old_detector)
+        return True
+    
+    def _release_detectors(self):
+        """釋放在註冊表取得的共用檢測器（重複呼叫安全）"""
+        registry = get_detector_registry()
+        with self._detection_lock:
+            for attr in ('monster_detector', 'health_detector', 'character_health_detector'):
+                detector = getattr(self, attr, None)
+                if detector is not None and registry.release(detector):
+                    setattr(self, attr, None)
+    
+    def closeEvent(self, event):
+        """關閉視窗：停止檢測與即時顯示執行緒，釋放共用檢測器"""
+        self.detection_enabled = False
+        self.is_running = False
+        self._stop_realtime_display()
+        
+        detection_thread = getattr(self, 'detection_thread', None)
+        if detection_thread is not None and detection_thread.is_alive():
+            detection_thread.join(timeout=2.0)
+        
+        self._release_detectors()
+        super().closeEvent(event)
+
     def run(self):
         """運行GUI應用程式"""
         try:
@@ -1896,7 +1965,9 @@ class MonsterDetectionGUI(QMainWindow):
             
             # 載入模板
             if hasattr(self, 'monster_detector') and self.monster_detector:
-                template_count = self.monster_detector.load_template_folder(full_path)
+                if not self._switch_monster_template_folder(full_path):
+                    return
+                template_count = len(self.monster_detector.templates)
                 self.logger.info(f"自動載入成功: {first_folder} ({template_count} 個模板)")
                 
                 # 更新選單
@@ -0,0 +1,143 @@
+# tools/benchmark_minimap.py - 小地圖角點檢測效能測試
+
+"""
+量測 TemplateMatcherTracker._try_detect_minimap 的每次呼叫成本。
+
+- after：目前版本（亞像素定位重用角點搜索的相關圖）
+- before：複製自舊版本的角點檢測路徑（每個找到的角點再做一次全畫面 cv2.matchTemplate 供亞像素定位）
+
+兩者使用相同的預處理畫面，並檢查回傳的小地圖位置一致。
+
+用法：
+    python tools/benchmark_minimap.py --frames <錄製畫面資料夾> [--repeat 5]
+
+未指定 --frames 時，以角點模板合成測試畫面（僅供相對比較）。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.coordinate import TemplateMatcherTracker
+
+
+def load_frames(folder):
+    """載入資料夾中的錄製畫面（支援UTF-8路徑）"""
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+            continue
+        data = np.fromfile(os.path.join(folder, name), dtype=np.uint8)
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def synthesize_frames(tracker, count=5, size=(1080, 1920)):
+    """以角點模板合成含小地圖的測試畫面"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        frame = cv2.GaussianBlur((rng.random(size) * 120).astype(np.uint8), (7, 7), 0)
+        x1, y1, x2, y2 = 20 + i, 40, 300 + i, 220
+        frame[y1:y2, x1:x2] = 90
+        for key, tmpl in tracker.corner_templates.items():
+            h, w = tmpl.shape
+            px = x1 if 'left' in key else x2 - w
+            py = y1 if 'top' in key else y2 - h
+            frame[py:py + h, px:px + w] = tmpl
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    return frames
+
+
+def legacy_try_detect_minimap(tracker, gray_frame, threshold):
+    """舊版本 _try_detect_minimap 的灰階角點路徑（逐行複製，作為 before 基準）
+
+    亞像素定位時對找到的角點重新計算整張相關圖；邊界檢查使用畫面尺寸。
+    """
+    locs = {}
+    corners_found = 0
+    for key, tmpl in tracker.corner_templates.items():
+        res = cv2.matchTemplate(gray_frame, tmpl, cv2.TM_CCOEFF_NORMED)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+        if max_val >= threshold:
+            corners_found += 1
+            peak_x, peak_y = max_loc
+            if (peak_x > 0 and peak_y > 0 and
+                    peak_x < gray_frame.shape[1] - 1 and peak_y < gray_frame.shape[0] - 1):
+                peak_x, peak_y = tracker._subpixel_peak_location(
+                    cv2.matchTemplate(gray_frame, tmpl, cv2.TM_CCOEFF_NORMED),
+                    peak_x, peak_y
+                )
+            x = peak_x if 'left' in key else peak_x + tmpl.shape[1]
+            y = peak_y if 'top' in key else peak_y + tmpl.shape[0]
+            locs[key] = (x, y)
+    if corners_found >= 4:
+        x1, y1 = float(locs['topleft'][0]), float(locs['topleft'][1])
+        x2, y2 = float(locs['bottomright'][0]), float(locs['bottomright'][1])
+        if x1 < x2 and y1 < y2:
+            return (int(x1), int(y1), int(x2), int(y2))
+    return None
+
+
+def time_per_call(func, gray_frames, threshold, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for gray in gray_frames:
+            func(gray, threshold)
+    return (time.perf_counter() - start) / (repeat * len(gray_frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="小地圖角點檢測效能測試")
+    parser.add_argument('--frames', help="錄製畫面資料夾")
+    parser.add_argument('--config', default="configs/config.yaml")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    tracker = TemplateMatcherTracker(config)
+    threshold = tracker.minimap_corner_threshold
+
+    if args.frames:
+        frames = load_frames(args.frames)
+        source = args.frames
+    else:
+        frames = synthesize_frames(tracker)
+        source = "合成畫面"
+    if not frames:
+        print(f"❌ 沒有可用的畫面: {source}")
+        return 1
+
+    # 舊版本只有灰階角點路徑可供比較
+    tracker.use_gray_only_for_corners = True
+    gray_frames = [tracker._preprocess_gray_image(cv2.cvtColor(f, cv2.COLOR_BGR2GRAY)) for f in frames]
+
+    mismatches = [i for i, g in enumerate(gray_frames)
+                  if legacy_try_detect_minimap(tracker, g, threshold) != tracker._try_detect_minimap(g, threshold)]
+
+    before = time_per_call(lambda g, t: legacy_try_detect_minimap(tracker, g, t), gray_frames, threshold, args.repeat)
+    after = time_per_call(tracker._try_detect_minimap, gray_frames, threshold, args.repeat)
+
+    print(f"📊 畫面來源: {source} ({len(frames)} 幀, {frames[0].shape[1]}x{frames[0].shape[0]})")
+    print(f"   before: {before * 1000:.1f} ms/次")
+    print(f"   after:  {after * 1000:.1f} ms/次")
+    print(f"   加速:   {before / after:.2f}x")
+    if mismatches:
+        print(f"❌ {len(mismatches)} 幀的小地圖位置與舊版本不同: {mismatches}")
+        return 1
+    print("✅ 小地圖位置與舊版本一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
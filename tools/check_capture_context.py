@@ -0,0 +1,140 @@
+# tools/check_capture_context.py - 持久捕捉上下文緩衝區重用檢查
+
+"""
+以 ArrayCaptureBackend 驅動 CaptureContext，檢查資源與緩衝區的重建時機：
+
+- 同尺寸連續捕捉：allocations / generation 維持不變，BGRA 緩衝區為同一個陣列
+- 尺寸改變：allocations / generation 各加一，之後同尺寸捕捉再次維持不變
+- invalidate() 後：下次捕捉重新建立資源
+- 每次捕捉的 BGR 輸出與來源畫面內容一致（reuse_output 時輸出緩衝區也重用）
+
+同時輸出同尺寸捕捉的每次耗時。不需要 Windows 或遊戲視窗，失敗時回傳代碼 1。
+
+用法：
+    python tools/check_capture_context.py [--width 1920] [--height 1080] [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from includes.capture_backend_utils import ArrayCaptureBackend, CaptureContext
+
+
+class FrameFeed:
+    """依序回傳目前尺寸的隨機 BGR 畫面（記住最後一張供比對）"""
+
+    def __init__(self, width, height):
+        self.rng = np.random.default_rng(0)
+        self.size = (width, height)
+        self.last = None
+
+    def __call__(self):
+        width, height = self.size
+        self.last = self.rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        return self.last
+
+
+def check_counters(context, backend, expected, label):
+    """比對 allocations / generation 與預期值，回傳錯誤訊息列表"""
+    actual = (backend.allocations, context.generation)
+    if actual != (expected, expected):
+        return [f"{label}: allocations/generation 為 {actual}，預期 ({expected}, {expected})"]
+    return []
+
+
+def capture_series(context, feed, count, label):
+    """連續捕捉 count 次，回傳 (BGRA 緩衝區 id 集合, BGR 輸出 id 集合, 錯誤訊息列表)"""
+    bgra_ids, bgr_ids, errors = set(), set(), []
+    for i in range(count):
+        frame = context.capture(None)
+        if frame is None:
+            errors.append(f"{label}: 第 {i} 次捕捉失敗")
+            continue
+        if not np.array_equal(frame, feed.last):
+            errors.append(f"{label}: 第 {i} 次捕捉內容與來源不同")
+        bgra_ids.add(id(context._bgra))
+        bgr_ids.add(id(frame))
+    return bgra_ids, bgr_ids, errors
+
+
+def run_checks(width, height, count, reuse_output):
+    """以指定輸出模式執行所有檢查，回傳錯誤訊息列表"""
+    mode = "reuse_output" if reuse_output else "copy_output"
+    feed = FrameFeed(width, height)
+    backend = ArrayCaptureBackend(feed)
+    context = CaptureContext(backend, reuse_output=reuse_output)
+    errors = []
+
+    # 同尺寸：只在第一次建立資源
+    bgra_ids, bgr_ids, series_errors = capture_series(context, feed, count, f"{mode} 同尺寸")
+    errors += series_errors
+    errors += check_counters(context, backend, 1, f"{mode} 同尺寸 {count} 次後")
+    if len(bgra_ids) != 1:
+        errors.append(f"{mode} 同尺寸: BGRA 緩衝區建立了 {len(bgra_ids)} 個")
+    if reuse_output and len(bgr_ids) != 1:
+        errors.append(f"{mode} 同尺寸: BGR 輸出緩衝區建立了 {len(bgr_ids)} 個")
+
+    # 尺寸改變：重建一次，之後同尺寸維持不變
+    feed.size = (width // 2, height // 2)
+    errors += capture_series(context, feed, 1, f"{mode} 尺寸改變")[2]
+    errors += check_counters(context, backend, 2, f"{mode} 尺寸改變後")
+    errors += capture_series(context, feed, count, f"{mode} 新尺寸")[2]
+    errors += check_counters(context, backend, 2, f"{mode} 新尺寸 {count} 次後")
+
+    # 失效後重建
+    context.invalidate()
+    errors += capture_series(context, feed, 1, f"{mode} 失效後")[2]
+    errors += check_counters(context, backend, 3, f"{mode} invalidate 後")
+
+    if context.stats['opens'] != backend.allocations:
+        errors.append(f"{mode}: stats['opens'] {context.stats['opens']} 與 allocations {backend.allocations} 不同")
+    context.close()
+    return errors
+
+
+def time_capture(width, height, repeat, reuse_output):
+    """同尺寸捕捉（固定來源畫面）的每次平均耗時"""
+    frame = np.random.default_rng(1).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    context = CaptureContext(ArrayCaptureBackend(frame), reuse_output=reuse_output)
+    context.capture(None)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        context.capture(None)
+    elapsed = (time.perf_counter() - start) / repeat
+    context.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="持久捕捉上下文緩衝區重用檢查")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--count', type=int, default=5, help="每種尺寸連續捕捉次數")
+    parser.add_argument('--repeat', type=int, default=50, help="計時捕捉次數")
+    args = parser.parse_args()
+
+    errors = []
+    for reuse_output in (False, True):
+        errors += run_checks(args.width, args.height, args.count, reuse_output)
+
+    copy_time = time_capture(args.width, args.height, args.repeat, False)
+    reuse_time = time_capture(args.width, args.height, args.repeat, True)
+    print(f"📊 {args.width}x{args.height}, 每種尺寸 {args.count} 次捕捉")
+    print(f"   同尺寸捕捉: copy_output {copy_time * 1000:.2f} ms/次, reuse_output {reuse_time * 1000:.2f} ms/次")
+
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        return 1
+    print("✅ 同尺寸重用資源，尺寸改變/失效時重建一次")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
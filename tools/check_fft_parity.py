@@ -0,0 +1,185 @@
+# tools/check_fft_parity.py - FFT 匹配引擎準確度比對
+
+"""
+比對 FFTBatchMatcher 與 cv2.matchTemplate(TM_CCOEFF_NORMED) 的結果。
+
+- 相關圖：每個模板的分數圖最大誤差不得超過 --tolerance
+- 峰值：opencv 路徑的每個峰值都必須在 fft 路徑找到位置相差不超過 1 像素、分數誤差在容許範圍內的峰值
+- 檢測器：matching_engine 為 opencv 與 fft 的 SimpleMonsterDetector 輸出相同的怪物框
+
+同時輸出兩個引擎的每幀耗時，以及所有模板補成同尺寸時的耗時（fft 引擎只在同尺寸模板多時才有優勢）。
+
+用法：
+    python tools/check_fft_parity.py [--templates templates/monsters] [--frames <錄製畫面資料夾>]
+
+未指定 --frames 時，將模板貼到雜訊背景上合成測試畫面。失敗時回傳代碼 1。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from includes.fft_match_utils import FFTBatchMatcher
+from includes.match_utils import MatchUtils
+from includes.simple_template_utils import SimpleMonsterDetector
+from tools.benchmark_minimap import load_frames
+
+
+def synthesize_frames(templates, count=3, size=(1080, 1920)):
+    """將模板貼到模糊雜訊背景的隨機位置，合成測試畫面"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        frame = cv2.GaussianBlur((rng.random(size) * 160).astype(np.uint8), (9, 9), 0)
+        for template in templates[:8]:
+            h, w = template.shape[:2]
+            x = int(rng.integers(0, size[1] - w))
+            y = int(rng.integers(0, size[0] - h))
+            frame[y:y + h, x:x + w] = template
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+    return frames
+
+
+def create_detector(config, engine, templates):
+    """以指定匹配引擎建立不載入模板目錄的檢測器，並套用相同模板"""
+    engine_config = dict(config)
+    engine_config['monster_detection'] = dict(config.get('monster_detection', {}),
+                                              matching_engine=engine, roi_enabled=False,
+                                              motion_gating_enabled=False, tracking_enabled=False,
+                                              coarse_to_fine_enabled=False, max_processing_time=60.0)
+    detector = SimpleMonsterDetector(template_dir=None, config=engine_config)
+    detector.templates = templates
+    detector._invalidate_template_cache()
+    return detector
+
+
+def check_score_maps(small_gray, scaled_templates, threshold, tolerance, max_peaks):
+    """比對單一畫面所有模板的相關圖與峰值，回傳 (最大分數誤差, 錯誤訊息列表)"""
+    matcher = FFTBatchMatcher()
+    groups = {}
+    for template in scaled_templates:
+        if template.shape[0] <= small_gray.shape[0] and template.shape[1] <= small_gray.shape[1]:
+            groups.setdefault(template.shape[:2], []).append(template)
+
+    max_error = 0.0
+    errors = []
+    for size, group in groups.items():
+        fft_maps = matcher.match_group(small_gray, group, size)
+        for index, (template, fft_map) in enumerate(zip(group, fft_maps)):
+            cv_map = cv2.matchTemplate(small_gray, template, cv2.TM_CCOEFF_NORMED)
+            if cv_map.shape != fft_map.shape:
+                errors.append(f"{size}#{index}: 分數圖尺寸不同 {cv_map.shape} vs {fft_map.shape}")
+                continue
+            max_error = max(max_error, float(np.max(np.abs(cv_map - fft_map))))
+
+            neighborhood = min(size) // 2
+            cv_peaks = MatchUtils.find_local_peaks(cv_map, threshold, max_peaks, neighborhood)
+            fft_peaks = MatchUtils.find_local_peaks(fft_map, threshold - tolerance, max_peaks * 2, neighborhood)
+            for x, y, score in zip(*cv_peaks):
+                near = (np.abs(fft_peaks[0] - x) <= 1) & (np.abs(fft_peaks[1] - y) <= 1)
+                if not near.any() or np.min(np.abs(fft_peaks[2][near] - score)) > tolerance:
+                    errors.append(f"{size}#{index}: 峰值 ({x}, {y}) 分數 {score:.4f} 在 fft 結果中找不到")
+    return max_error, errors
+
+
+def check_detections(cv_result, fft_result, tolerance):
+    """比對兩個檢測器的輸出（依分數排序後逐一比對框與分數）"""
+    if len(cv_result) != len(fft_result):
+        return [f"檢測數量不同: opencv {len(cv_result)} vs fft {len(fft_result)}"]
+    errors = []
+    cv_order = np.lexsort((cv_result.boxes[:, 1], cv_result.boxes[:, 0]))
+    fft_order = np.lexsort((fft_result.boxes[:, 1], fft_result.boxes[:, 0]))
+    box_diff = np.abs(cv_result.boxes[cv_order] - fft_result.boxes[fft_order])
+    score_diff = np.abs(cv_result.scores[cv_order] - fft_result.scores[fft_order])
+    if box_diff.size and box_diff.max() > 2:
+        errors.append(f"怪物框位置差異 {int(box_diff.max())} 像素")
+    if score_diff.size and score_diff.max() > tolerance:
+        errors.append(f"怪物分數差異 {float(score_diff.max()):.2e}")
+    return errors
+
+
+def time_detector(detector, frames, repeat):
+    detector.detect_monsters(frames[0])  # 預熱（建立模板頻譜緩存）
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            detector.detect_monsters(frame)
+    return (time.perf_counter() - start) / (repeat * len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFT 匹配引擎準確度比對")
+    parser.add_argument('--templates', default="templates/monsters")
+    parser.add_argument('--frames', help="錄製畫面資料夾")
+    parser.add_argument('--config', default="configs/config.yaml")
+    parser.add_argument('--tolerance', type=float, default=1e-3)
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config['monster_detection'] = dict(config.get('monster_detection', {}), template_bundle_enabled=False)
+
+    loader = SimpleMonsterDetector(template_dir=args.templates, config=config)
+    templates = loader.templates
+    if not templates:
+        print(f"❌ 沒有可用的模板: {args.templates}")
+        return 1
+
+    frames = load_frames(args.frames) if args.frames else synthesize_frames([t['image'] for t in templates])
+    if not frames:
+        print(f"❌ 沒有可用的畫面: {args.frames}")
+        return 1
+
+    cv_detector = create_detector(config, 'opencv', templates)
+    fft_detector = create_detector(config, 'fft', templates)
+    scale = cv_detector.scale_factor
+
+    errors = []
+    max_error = 0.0
+    for frame_index, frame in enumerate(frames):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small_gray = cv2.resize(gray, None, fx=scale, fy=scale)
+        scaled = [t for s in cv_detector._get_match_scales() for t in cv_detector._get_scaled_templates(s)]
+        frame_error, frame_errors = check_score_maps(small_gray, scaled, cv_detector.confidence_threshold,
+                                                     args.tolerance, cv_detector.max_detections)
+        max_error = max(max_error, frame_error)
+        frame_errors += check_detections(cv_detector.detect_monsters(frame),
+                                         fft_detector.detect_monsters(frame), args.tolerance)
+        errors += [f"幀 {frame_index}: {e}" for e in frame_errors]
+
+    cv_time = time_detector(cv_detector, frames, args.repeat)
+    fft_time = time_detector(fft_detector, frames, args.repeat)
+
+    # 所有模板補成同一尺寸：fft 引擎一次畫面頻譜可供整組模板共用
+    h, w = templates[0]['size'][:2]
+    same_size = [dict(t, image=cv2.resize(t['image'], (w, h)), size=(h, w)) for t in templates]
+    cv_same = time_detector(create_detector(config, 'opencv', same_size), frames, args.repeat)
+    fft_same = time_detector(create_detector(config, 'fft', same_size), frames, args.repeat)
+
+    groups = len({t.shape[:2] for s in cv_detector._get_match_scales() for t in cv_detector._get_scaled_templates(s)})
+    print(f"📊 {len(frames)} 幀 ({frames[0].shape[1]}x{frames[0].shape[0]}), "
+          f"{len(templates)} 個模板 ({groups} 種尺寸), 縮放 {scale}")
+    print(f"   相關圖最大誤差: {max_error:.2e} (容許 {args.tolerance:.0e})")
+    print(f"   目前模板:   opencv {cv_time * 1000:.1f} ms/幀, fft {fft_time * 1000:.1f} ms/幀")
+    print(f"   同尺寸模板: opencv {cv_same * 1000:.1f} ms/幀, fft {fft_same * 1000:.1f} ms/幀")
+
+    if max_error > args.tolerance:
+        errors.append(f"相關圖最大誤差 {max_error:.2e} 超過容許值")
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        return 1
+    print("✅ fft 與 opencv 結果一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())